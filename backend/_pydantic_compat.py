@@ -0,0 +1,32 @@
+"""
+Pydantic v1/v2 compatibility helpers
+
+Imported once per process; validators.py and other model modules share it.
+"""
+
+# Provide a stable `root_validator` decorator that maps to Pydantic v2's
+# `model_validator(mode='after')` when available, falls back to the legacy
+# v1 `root_validator`, and is a no-op when Pydantic is absent (e.g. in
+# constrained tooling environments).
+try:
+    from pydantic import model_validator as _model_validator
+
+    def _make_validator(**kwargs):
+        return _model_validator(mode='after', **kwargs)
+except Exception:
+    try:
+        from pydantic import root_validator as _legacy_root_validator
+
+        def _make_validator(**kwargs):
+            return _legacy_root_validator(**kwargs)
+    except Exception:
+        def _make_validator(**kwargs):
+            return lambda f: f
+
+
+def root_validator(func=None, **kwargs):
+    """Map legacy `@root_validator` / `@root_validator(...)` usage to the installed Pydantic."""
+    decorator = _make_validator(**kwargs)
+    if func is None:
+        return decorator
+    return decorator(func)
@@ -45,6 +45,7 @@ def setup_structlog():
     
     # Configure structlog processors
     processors = [
+        structlog.contextvars.merge_contextvars,
         structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
@@ -122,6 +122,13 @@ external_service_availability_percent = Gauge(
     registry=registry,
 )
 
+operation_timeouts_total = Counter(
+    "phishx_timeouts_total",
+    "Operations that exceeded their timeout",
+    ["operation"],
+    registry=registry,
+)
+
 # ========================================
 # Queue & Worker Metrics
 # ========================================
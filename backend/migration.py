@@ -40,6 +40,11 @@ CREATE INDEX IF NOT EXISTS idx_soc_alerts_status_open
 CREATE INDEX IF NOT EXISTS idx_soc_alerts_category 
   ON soc_alerts(category, created_at DESC);
 
+-- Bounded index scan for the batched resolved-alert cleanup
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_soc_alerts_resolved_created_at 
+  ON soc_alerts(created_at)
+  WHERE status = 'RESOLVED';
+
 -- SOC actions indexes
 CREATE INDEX IF NOT EXISTS idx_soc_actions_alert_id 
   ON soc_actions(alert_id, created_at DESC);
@@ -123,6 +128,26 @@ ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
 CREATE INDEX IF NOT EXISTS idx_soc_alerts_updated_at 
   ON soc_alerts(updated_at DESC);
 
+-- ========================================
+-- ENFORCEMENT STATE
+-- ========================================
+
+-- Enforcement workers claim a decision with a single UPDATE ... RETURNING:
+-- pending -> queued -> done, or failed once the task's retries run out
+ALTER TABLE email_decisions 
+ADD COLUMN IF NOT EXISTS enforcement_state VARCHAR(20) DEFAULT 'pending';
+
+ALTER TABLE email_decisions
+ADD CONSTRAINT chk_email_decisions_enforcement_state 
+  CHECK (enforcement_state IN ('pending', 'queued', 'done', 'failed'));
+
+-- Celery id of the claiming task; retries keep it and may re-claim
+ALTER TABLE email_decisions 
+ADD COLUMN IF NOT EXISTS enforcement_task_id VARCHAR(255);
+
+ALTER TABLE email_decisions 
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
 -- ========================================
 -- PHASE 1: PERFORMANCE TUNING
 -- ========================================
@@ -150,6 +175,7 @@ DROP INDEX IF EXISTS idx_email_decisions_created_at;
 DROP INDEX IF EXISTS idx_soc_alerts_tenant_status;
 DROP INDEX IF EXISTS idx_soc_alerts_status_open;
 DROP INDEX IF EXISTS idx_soc_alerts_category;
+DROP INDEX IF EXISTS idx_soc_alerts_resolved_created_at;
 DROP INDEX IF EXISTS idx_soc_actions_alert_id;
 DROP INDEX IF EXISTS idx_soc_actions_created_at;
 DROP INDEX IF EXISTS idx_audit_log_entity;
@@ -172,10 +198,16 @@ DROP CONSTRAINT IF EXISTS fk_soc_alerts_tenant;
 ALTER TABLE ml_feedback 
 DROP CONSTRAINT IF EXISTS fk_ml_feedback_tenant;
 
+ALTER TABLE email_decisions 
+DROP CONSTRAINT IF EXISTS chk_email_decisions_enforcement_state;
+
 -- Drop columns
 ALTER TABLE email_decisions 
 DROP COLUMN IF EXISTS tenant_id,
-DROP COLUMN IF EXISTS processed_by;
+DROP COLUMN IF EXISTS processed_by,
+DROP COLUMN IF EXISTS enforcement_state,
+DROP COLUMN IF EXISTS enforcement_task_id,
+DROP COLUMN IF EXISTS updated_at;
 
 ALTER TABLE soc_alerts 
 DROP COLUMN IF EXISTS tenant_id,
@@ -1,18 +1,40 @@
+import re
+
+
+# (keyword, weight) in reporting order
+KEYWORDS = (
+    ("urgent", 0.2),
+    ("verify", 0.2),
+    ("suspended", 0.3),
+    ("password", 0.3),
+    ("immediately", 0.2),
+)
+
+# One case-insensitive alternation scans each field once, with no lowered
+# copy. Group i+1 is KEYWORDS[i]; no keyword overlaps another, so
+# non-overlapping matches find every keyword present.
+_KEYWORD_RE = re.compile(
+    "|".join(f"({re.escape(word)})" for word, _ in KEYWORDS), re.IGNORECASE
+)
+
+
 def analyze_email_text(subject: str, body: str):
-    text = f"{subject} {body}".lower()
     score = 0.0
     signals = []
 
-    keywords = [
-        ("urgent", 0.2),
-        ("verify", 0.2),
-        ("suspended", 0.3),
-        ("password", 0.3),
-        ("immediately", 0.2),
-    ]
+    # Keywords contain no spaces, so scanning the fields separately matches
+    # the same words as scanning "subject body"
+    hits = set()
+    for text in (subject, body):
+        for match in _KEYWORD_RE.finditer(text):
+            hits.add(match.lastindex - 1)
+            if len(hits) == len(KEYWORDS):
+                break
+        if len(hits) == len(KEYWORDS):
+            break
 
-    for word, weight in keywords:
-        if word in text:
+    for index, (word, weight) in enumerate(KEYWORDS):
+        if index in hits:
             signals.append(f"Keyword detected: {word}")
             score += weight
 
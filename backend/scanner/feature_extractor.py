@@ -1,31 +1,87 @@
-import re
 import math
-from urllib.parse import urlparse
+
+import numpy as np
+
+from scanner.url_parse_cache import parse_url
 
 SUSPICIOUS_KEYWORDS = [
     "login", "verify", "update", "secure", "account",
     "bank", "paypal", "confirm", "signin", "reset"
 ]
 
+# Column order of extract_url_feature_matrix; matches extract_url_features keys
+FEATURE_NAMES = (
+    "url_length", "num_dots", "num_digits", "num_special", "entropy",
+    "has_ip", "https", "suspicious_words", "path_length",
+)
+
+# Every byte except ASCII 0-9; deleting these leaves only the digits
+_NON_DIGIT_BYTES = bytes(b for b in range(256) if not 0x30 <= b <= 0x39)
+
 def shannon_entropy(s: str) -> float:
     if not s:
         return 0.0
     probs = [s.count(c) / len(s) for c in set(s)]
     return -sum(p * math.log2(p) for p in probs)
 
+def _count_digits(s: str) -> int:
+    """sum(c.isdigit() for c in s), via a C-level bytes.translate for ASCII input"""
+    if s.isascii():
+        return len(s.encode("ascii").translate(None, _NON_DIGIT_BYTES))
+    return sum(c.isdigit() for c in s)
+
+def _starts_with_ipv4(host: str) -> bool:
+    """True if host starts with four dot-separated runs of digits"""
+    parts = host.split(".", 3)
+    return (
+        len(parts) == 4
+        and parts[0].isdecimal()
+        and parts[1].isdecimal()
+        and parts[2].isdecimal()
+        and parts[3][:1].isdecimal()
+    )
+
+def _parse(url: str):
+    return parse_url(url if url.startswith("http") else f"http://{url}")
+
 def extract_url_features(url: str) -> dict:
-    parsed = urlparse(url if url.startswith("http") else f"http://{url}")
+    parsed = _parse(url)
     host = parsed.netloc or ""
     path = parsed.path or ""
 
     return {
         "url_length": len(url),
         "num_dots": url.count("."),
-        "num_digits": sum(c.isdigit() for c in url),
+        "num_digits": _count_digits(url),
         "num_special": sum(not c.isalnum() for c in url),
         "entropy": shannon_entropy(url),
-        "has_ip": int(bool(re.match(r"\d+\.\d+\.\d+\.\d+", host))),
+        "has_ip": int(_starts_with_ipv4(host)),
         "https": int(url.startswith("https")),
         "suspicious_words": sum(k in url.lower() for k in SUSPICIOUS_KEYWORDS),
         "path_length": len(path),
     }
+
+def extract_url_feature_matrix(urls: list[str]) -> np.ndarray:
+    """
+    Features for a batch of URLs as one float32 matrix (rows are URLs,
+    columns follow FEATURE_NAMES), filled a column at a time.
+    """
+    n = len(urls)
+    parsed = [_parse(u) for u in urls]
+    lowered = [u.lower() for u in urls]
+    columns = (
+        (len(u) for u in urls),
+        (u.count(".") for u in urls),
+        (_count_digits(u) for u in urls),
+        (sum(not c.isalnum() for c in u) for u in urls),
+        (shannon_entropy(u) for u in urls),
+        (_starts_with_ipv4(p.netloc) for p in parsed),
+        (u.startswith("https") for u in urls),
+        (sum(k in u for k in SUSPICIOUS_KEYWORDS) for u in lowered),
+        (len(p.path) for p in parsed),
+    )
+
+    X = np.empty((n, len(FEATURE_NAMES)), dtype=np.float32)
+    for j, column in enumerate(columns):
+        X[:, j] = np.fromiter(column, dtype=np.float32, count=n)
+    return X
@@ -1,6 +1,10 @@
 from typing import List, Dict, Any
 
 
+# Blend weights for the NLP model, URL model and text heuristics
+NLP_WEIGHT, URL_WEIGHT, HEURISTIC_WEIGHT = 0.4, 0.4, 0.2
+
+
 def calculate_risk(
     *,
     text_ml_score: float,
@@ -18,41 +22,36 @@ def calculate_risk(
     - ClamAV attachment scanning
     """
 
-    reasons: List[str] = []
-    total_score = 0.0
-
-    # -------------------------------------------------
-    # NLP ML score (40%)
-    # -------------------------------------------------
-    total_score += float(text_ml_score) * 0.4
-    if text_ml_score > 0:
-        reasons.append("NLP phishing model detected risk")
-
     # -------------------------------------------------
-    # URL ML v2 score (40%)
+    # Weighted score: NLP ML (40%), URL ML v2 (40%), heuristics (20%)
     # -------------------------------------------------
+    text_ml_score = float(text_ml_score)
     url_score = float(url_result.get("score", 0.0))
-    url_signals = url_result.get("signals", [])
+    heuristic_score = float(text_findings.get("score", 0.0))
 
-    total_score += url_score * 0.4
-    if url_score > 0:
-        reasons.extend(url_signals)
+    total_score = (
+        text_ml_score * NLP_WEIGHT
+        + url_score * URL_WEIGHT
+        + heuristic_score * HEURISTIC_WEIGHT
+    )
 
     # -------------------------------------------------
-    # Heuristic email text signals (20%)
+    # Explainability
     # -------------------------------------------------
-    heuristic_score = float(text_findings.get("score", 0.0))
-    heuristic_signals = text_findings.get("signals", [])
-
-    total_score += heuristic_score * 0.2
-    reasons.extend(heuristic_signals)
+    # dict as an insertion-ordered set: repeated signals collapse, order is kept
+    reasons: Dict[str, None] = {}
+    if text_ml_score > 0:
+        reasons["NLP phishing model detected risk"] = None
+    if url_score > 0:
+        reasons.update(dict.fromkeys(url_result.get("signals", [])))
+    reasons.update(dict.fromkeys(text_findings.get("signals", [])))
 
     # -------------------------------------------------
     # Attachments — HARD OVERRIDE
     # -------------------------------------------------
     if malware_hits:
         total_score = max(total_score, 0.9)
-        reasons.append("Malicious attachment detected")
+        reasons["Malicious attachment detected"] = None
 
     # -------------------------------------------------
     # Final verdict
@@ -67,5 +66,5 @@ def calculate_risk(
     return {
         "score": round(min(total_score, 1.0), 2),
         "verdict": verdict,
-        "reasons": reasons or ["fallback risk calculation used"],
+        "reasons": list(reasons) or ["fallback risk calculation used"],
     }
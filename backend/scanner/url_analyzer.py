@@ -1,15 +1,63 @@
 import re
-from urllib.parse import urlparse
+
+from scanner.url_parse_cache import parse_url
 
 
 SUSPICIOUS_TLDS = {
     ".zip", ".review", ".country", ".link", ".click", ".top", ".xyz"
 }
 
+
+def _build_suffix_trie(suffixes):
+    """Index dotted suffixes by reversed label; '$' marks a complete suffix"""
+    trie = {}
+    for suffix in suffixes:
+        node = trie
+        for label in reversed(suffix.strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node["$"] = suffix
+    return trie
+
+
+# Derived lookup index; SUSPICIOUS_TLDS stays the source of truth
+_TLD_TRIE = _build_suffix_trie(SUSPICIOUS_TLDS)
+
+
+def _is_ipv4(domain):
+    """Four dot-separated runs of 1-3 digits; str methods instead of a regex"""
+    if domain.count(".") != 3:
+        return False
+    return all(part.isdecimal() and len(part) <= 3 for part in domain.split("."))
+
+
+def _match_suffix(trie, domain):
+    """Return the shortest indexed suffix of domain, or None"""
+    node = trie
+    # The leading label never counts: a suffix must follow a dot
+    for label in reversed(domain.split(".")[1:]):
+        node = node.get(label)
+        if node is None:
+            return None
+        if "$" in node:
+            return node["$"]
+    return None
+
 BRAND_KEYWORDS = {
     "paypal", "google", "facebook", "apple", "microsoft", "amazon", "bank"
 }
 
+# One alternation scans each domain once for every brand. No brand overlaps
+# another, so non-overlapping matches find every brand present.
+_BRAND_RE = re.compile("|".join(map(re.escape, sorted(BRAND_KEYWORDS))))
+
+
+def _brand_owner(domain):
+    """Brand whose own <brand>.com the domain is (or is a subdomain of), or None"""
+    labels = domain.rsplit(".", 2)
+    if len(labels) >= 2 and labels[-1] == "com" and labels[-2] in BRAND_KEYWORDS:
+        return labels[-2]
+    return None
+
 
 def analyze_urls(urls: list[str]) -> dict:
     """
@@ -28,24 +76,25 @@ def analyze_urls(urls: list[str]) -> dict:
     signals = []
 
     for url in urls:
-        parsed = urlparse(url)
+        parsed = parse_url(url)
         domain = parsed.netloc.lower()
 
         # 1. IP-based URL
-        if re.match(r"^\d{1,3}(\.\d{1,3}){3}$", domain):
+        if _is_ipv4(domain):
             score += 0.3
             signals.append("IP-based URL")
 
         # 2. Suspicious TLD
-        for tld in SUSPICIOUS_TLDS:
-            if domain.endswith(tld):
-                score += 0.2
-                signals.append(f"Suspicious TLD: {tld}")
-                break
+        tld = _match_suffix(_TLD_TRIE, domain)
+        if tld:
+            score += 0.2
+            signals.append(f"Suspicious TLD: {tld}")
 
         # 3. Brand impersonation
-        for brand in BRAND_KEYWORDS:
-            if brand in domain and not domain.endswith(f"{brand}.com"):
+        for match in _BRAND_RE.finditer(domain):
+            brand = match.group()
+            # Compare whole labels: evilpaypal.com is not paypal.com
+            if brand != _brand_owner(domain):
                 score += 0.3
                 signals.append(f"Possible brand impersonation: {brand}")
                 break
@@ -65,3 +114,5 @@ def analyze_urls(urls: list[str]) -> dict:
     return {
         "score": score,
         "signals": signals,
+        "available": True
+    }
@@ -1,5 +1,5 @@
-from urllib.parse import urlparse
-import re
+from scanner.url_parse_cache import parse_url
+from scanner.feature_extractor import _count_digits, _starts_with_ipv4
 
 
 SUSPICIOUS_TLDS = {
@@ -8,17 +8,17 @@ SUSPICIOUS_TLDS = {
 
 
 def extract_url_features(url: str) -> dict:
-    parsed = urlparse(url)
+    parsed = parse_url(url)
     hostname = parsed.hostname or ""
     path = parsed.path or ""
 
     return {
         "url_length": len(url),
         "num_dots": hostname.count("."),
-        "has_ip": bool(re.match(r"\d+\.\d+\.\d+\.\d+", hostname)),
+        "has_ip": _starts_with_ipv4(hostname),
         "has_at_symbol": "@" in url,
         "has_https": parsed.scheme == "https",
         "suspicious_tld": hostname.split(".")[-1] in SUSPICIOUS_TLDS,
-        "num_digits": sum(c.isdigit() for c in url),
+        "num_digits": _count_digits(url),
         "path_length": len(path),
     }
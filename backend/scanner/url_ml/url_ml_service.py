@@ -34,6 +34,6 @@ def analyze_urls_ml(urls: list[str]) -> dict:
 
     return {
         "score": final_score,
-        "signals": list(set(signals)),
+        "signals": list(dict.fromkeys(signals)),
         "model_version": "url-ml-v2"
     }
@@ -1,16 +1,35 @@
+import threading
+
 from joblib import load
 from pathlib import Path
-from scanner.feature_extractor import extract_url_features
-import pandas as pd
+from scanner.feature_extractor import FEATURE_NAMES, extract_url_feature_matrix
+from log_config import logger
 
 MODEL_PATH = Path(__file__).resolve().parents[1] / "models" / "url_rf_v2.joblib"
 
 _model = None
+_model_lock = threading.Lock()
 
 def load_model():
     global _model
-    if _model is None and MODEL_PATH.exists():
-        _model = load(MODEL_PATH)
+    if _model is None:
+        with _model_lock:
+            if _model is None and MODEL_PATH.exists():
+                try:
+                    model = load(MODEL_PATH)
+                    # Fitted on a DataFrame: confirm the column order once, then
+                    # drop the names so predict_proba takes the bare matrix
+                    names = tuple(getattr(model, "feature_names_in_", FEATURE_NAMES))
+                    if names != FEATURE_NAMES:
+                        raise ValueError(
+                            f"URL model expects features {names}, extractor builds {FEATURE_NAMES}"
+                        )
+                except Exception:
+                    logger.error("url_model_load_failed", path=str(MODEL_PATH), exc_info=True)
+                    raise
+                if hasattr(model, "feature_names_in_"):
+                    del model.feature_names_in_
+                _model = model
 
 def analyze_urls(urls: list[str]) -> dict:
     load_model()
@@ -18,8 +37,7 @@ def analyze_urls(urls: list[str]) -> dict:
     if not urls or _model is None:
         return {"score": 0.0, "signals": [], "model": "url-ml-unavailable"}
 
-    features = pd.DataFrame([extract_url_features(u) for u in urls])
-    probs = _model.predict_proba(features)[:, 1]
+    probs = _model.predict_proba(extract_url_feature_matrix(urls))[:, 1]
 
     score = float(probs.max())
     signals = [f"High-risk URL detected ({round(score,2)})"] if score > 0.7 else []
@@ -0,0 +1,11 @@
+from functools import lru_cache
+from urllib.parse import ParseResult, urlparse
+
+
+# One parse per distinct URL for every analyzer in the scan pipeline. The
+# stdlib only caches the urlsplit step (128 entries); urlparse re-splits
+# params on every call. ParseResult is an immutable namedtuple, so sharing
+# cached instances is safe.
+@lru_cache(maxsize=4096)
+def parse_url(url: str) -> ParseResult:
+    return urlparse(url)
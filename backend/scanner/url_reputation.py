@@ -1,39 +1,162 @@
 # scanner/url_reputation.py
 
 import requests
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Dict
+from urllib.parse import urlunparse
+
+from requests.adapters import HTTPAdapter
+
+from scanner.url_parse_cache import parse_url
 
 URLHAUS_API = "https://urlhaus-api.abuse.ch/v1/url/"
 TIMEOUT = 4
+MAX_WORKERS = 8  # concurrent lookups per analyze_urls_reputation call
+
+
+def _build_session() -> requests.Session:
+    """Keep-alive session so lookups reuse pooled TLS connections"""
+    session = requests.Session()
+    session.mount(
+        "https://",
+        HTTPAdapter(pool_connections=16, pool_maxsize=32),
+    )
+    return session
+
 
-# Simple in-memory cache to avoid repeated calls
-_CACHE = {}
+_SESSION = _build_session()
+
+# Domains (and their subdomains) answered locally without a URLhaus lookup.
+# Only list domains that never serve user-uploaded content: URLhaus does
+# track malware hosted on shared platforms such as drive.google.com.
+REPUTATION_ALLOWLIST = frozenset({
+    "paypal.com", "apple.com", "microsoft.com", "amazon.com",
+})
+
+_ALLOWLIST_RESULT = {
+    "malicious": False,
+    "confidence": 0.0,
+    "source": "allowlist",
+    "reason": "Domain on reputation allowlist",
+}
+
+
+def _is_allowlisted(url: str) -> bool:
+    try:
+        host = parse_url(url).hostname
+    except ValueError:
+        return False
+    if not host:
+        return False
+    labels = host.split(".")
+    return any(
+        ".".join(labels[i:]) in REPUTATION_ALLOWLIST for i in range(len(labels) - 1)
+    )
+
+# Bounded in-memory LRU to avoid repeated calls: url -> (expires_at, result).
+# Expiry uses the monotonic clock so wall-clock jumps cannot extend or
+# flush entries; the lock covers the lookup threads.
+_CACHE: "OrderedDict[str, tuple]" = OrderedDict()
 _CACHE_TTL = 3600  # 1 hour
+_CACHE_MAXSIZE = 50_000
+_CACHE_LOCK = threading.Lock()
+
+# Singleflight: one URLhaus request per normalized URL at a time; concurrent
+# callers for the same URL wait on the first caller's Future
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
 
 
 def _is_cached(url: str):
-    entry = _CACHE.get(url)
-    if not entry:
-        return None
-    ts, result = entry
-    if time.time() - ts > _CACHE_TTL:
-        del _CACHE[url]
-        return None
-    return result
+    with _CACHE_LOCK:
+        entry = _CACHE.get(url)
+        if not entry:
+            return None
+        expires_at, result = entry
+        if time.monotonic() > expires_at:
+            del _CACHE[url]
+            return None
+        _CACHE.move_to_end(url)
+        return result
 
 
 def _set_cache(url: str, result: dict):
-    _CACHE[url] = (time.time(), result)
+    with _CACHE_LOCK:
+        _CACHE[url] = (time.monotonic() + _CACHE_TTL, result)
+        _CACHE.move_to_end(url)
+        if len(_CACHE) > _CACHE_MAXSIZE:
+            _CACHE.popitem(last=False)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_url(url: str) -> str:
+    """
+    Lookup and cache key: scheme and host lowercased, fragment dropped.
+    These spell the same request; path and query are left untouched
+    because URLhaus matches them exactly.
+    """
+    try:
+        parsed = parse_url(url)
+    except ValueError:
+        return url
+    if not parsed.scheme or not parsed.netloc:
+        return url
+    userinfo, at, hostport = parsed.netloc.rpartition("@")
+    return urlunparse(parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=userinfo + at + hostport.lower(),
+        fragment="",
+    ))
+
+
+def _local_verdict(url: str):
+    """Allowlist or cached result for url, or None if URLhaus must be asked"""
+    if _is_allowlisted(url):
+        return _ALLOWLIST_RESULT
+    return _is_cached(url)
 
 
 def check_url_reputation(url: str) -> Dict:
-    cached = _is_cached(url)
-    if cached:
-        return cached
+    url = _normalize_url(url)
+    local = _local_verdict(url)
+    if local:
+        return local
+
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(url)
+        if future is None:
+            # The previous owner may have finished since the cache miss
+            cached = _is_cached(url)
+            if cached:
+                return cached
+            future = _INFLIGHT[url] = Future()
+            owner = True
+        else:
+            owner = False
+
+    if not owner:
+        return future.result()
 
     try:
-        resp = requests.post(
+        result = _query_urlhaus(url)
+        _set_cache(url, result)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            del _INFLIGHT[url]
+
+
+def _query_urlhaus(url: str) -> Dict:
+    try:
+        resp = _SESSION.post(
             URLHAUS_API,
             data={"url": url},
             timeout=TIMEOUT,
@@ -67,7 +190,6 @@ def check_url_reputation(url: str) -> Dict:
             "reason": f"Threat intel unavailable: {str(e)}",
         }
 
-    _set_cache(url, result)
     return result
 
 
@@ -76,8 +198,26 @@ def analyze_urls_reputation(urls: List[str]) -> Dict:
     max_confidence = 0.0
     malicious_detected = False
 
+    # Answer each distinct URL from the allowlist or cache where possible;
+    # only misses go to URLhaus, in parallel since the calls are I/O-bound
+    keys = {url: _normalize_url(url) for url in urls}
+    results = {}
+    pending = []
+    for key in dict.fromkeys(keys.values()):
+        local = _local_verdict(key)
+        if local:
+            results[key] = local
+        else:
+            pending.append(key)
+
+    if len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(pending))) as executor:
+            results.update(zip(pending, executor.map(check_url_reputation, pending)))
+    else:
+        results.update((url, check_url_reputation(url)) for url in pending)
+
     for url in urls:
-        res = check_url_reputation(url)
+        res = results[keys[url]]
         findings.append({**res, "url": url})
 
         if res["malicious"]:
@@ -75,6 +75,10 @@ app.conf.task_time_limit = 60  # seconds
 app.conf.task_acks_late = True
 app.conf.worker_prefetch_multiplier = 1  # Process one task at a time
 
+# Pipeline steps hand results to each other through chain messages;
+# nothing reads task results from the backend
+app.conf.task_ignore_result = True
+
 # Retry policy for failed tasks
 app.conf.task_autoretry_for = (Exception,)
 app.conf.task_max_retries = 3
@@ -98,6 +102,8 @@ app.conf.result_backend_transport_options = {
 
 app.conf.task_routes = {
     "tasks.process_email": {"queue": "emails"},
+    "tasks.score_email": {"queue": "emails"},
+    "tasks.enrich_urls_after_nlp": {"queue": "enrichment"},
     "tasks.enrich_email": {"queue": "enrichment"},
     "tasks.enforce_decision": {"queue": "enforcement"},
     "tasks.high_priority_email": {"queue": "high_priority"},
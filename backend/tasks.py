@@ -6,15 +6,34 @@ Decouples email ingestion from processing pipeline.
 """
 
 import json
+import time
 import uuid
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 
+from celery import chain
+from psycopg2.extras import Json
+from structlog.contextvars import bind_contextvars, clear_contextvars
+
 from task_queue import app as celery_app
 from db import get_db
-import logging
+from log_config import logger
+from scanner.risk_engine import calculate_risk
+from scanner.url_ml_v2 import analyze_urls
 
-logger = logging.getLogger(__name__)
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        """Serialize to a JSON string via orjson"""
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        ).decode()
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        """Serialize to a JSON string via the stdlib encoder"""
+        return json.dumps(obj)
 
 # ========================================
 # Phase 3: Anomaly Detection Integration
@@ -31,6 +50,29 @@ except ImportError:
     logger.warning("anomaly_integration not available")
     ANOMALY_DETECTION_AVAILABLE = False
 
+# ========================================
+# API Helpers
+# ========================================
+
+# app_new imports this module at load time, so its helpers are bound
+# by the first task that needs them instead of at module import
+call_nlp_service = None
+get_active_policy = None
+
+
+def _bind_app_helpers() -> None:
+    """Resolve the API-side helpers used by the tasks (idempotent)"""
+    global call_nlp_service, get_active_policy
+    if get_active_policy is None:
+        from app_new import call_nlp_service, get_active_policy
+
+# ========================================
+# Decision Thresholds
+# ========================================
+
+# Categories that raise a SOC alert and queue enforcement
+_ENFORCE_CATEGORIES = frozenset({"WARM", "HOT"})
+
 # ========================================
 # Core Processing Tasks
 # ========================================
@@ -62,39 +104,90 @@ def process_email(
     5. Make enforcement decision
     6. Persist to database
     7. Queue enforcement actions
+    
+    Steps 2-7 run as a Celery chain; each step receives the previous
+    step's return value as its first argument, so no result backend
+    round trip is needed.
     """
     try:
-        from scanner.risk_engine import calculate_risk
-        from scanner.url_ml_v2 import analyze_urls
+        bind_contextvars(email_id=email_id, tenant_id=tenant_id, task="process_email")
         
-        # Import NLP service call
-        from app_new import call_nlp_service, get_active_policy
+        logger.info("email_processing_start", priority=priority)
         
-        logger.info(
-            "email_processing_start",
-            email_id=email_id,
-            tenant_id=tenant_id,
-            priority=priority,
+        # Every step keeps the broker priority this email was sent with
+        amqp_priority = (self.request.delivery_info or {}).get("priority")
+        
+        steps = [enrich_nlp.s(subject, body).set(queue="enrichment", priority=amqp_priority)]
+        if urls:
+            steps.append(
+                enrich_urls_after_nlp.s(urls).set(queue="enrichment", priority=amqp_priority)
+            )
+        steps.append(
+            score_email.s(
+                email_id,
+                subject,
+                sender,
+                body,
+                urls,
+                tenant_id,
+                priority,
+            ).set(queue="emails", priority=amqp_priority)
         )
+        workflow = chain(*steps)
+        workflow.apply_async()
+        
+        return {"email_id": email_id, "status": "queued"}
+        
+    except Exception as exc:
+        logger.error(
+            "email_processing_failed",
+            error=str(exc),
+            retry_count=self.request.retries,
+        )
+        # Retry with exponential backoff
+        raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+    
+    finally:
+        clear_contextvars()
+
+
+@celery_app.task(
+    bind=True,
+    max_retries=3,
+    default_retry_delay=60,
+    queue="emails",
+)
+def score_email(
+    self,
+    enrichment: Dict[str, Any],
+    email_id: str,
+    subject: str,
+    sender: str,
+    body: str,
+    urls: List[str],
+    tenant_id: str,
+    priority: str = "normal",
+) -> Dict[str, Any]:
+    """
+    Final pipeline step: score the enriched email, persist the decision
+    and queue enforcement.
+    """
+    try:
+        bind_contextvars(email_id=email_id, tenant_id=tenant_id, task="score_email")
+        _bind_app_helpers()
         
         # Get tenant policy
         policy = get_active_policy(tenant_id)
         cold_threshold = int(policy.get("cold_threshold", 40))
         warm_threshold = int(policy.get("warm_threshold", 75))
         
-        # NLP Analysis (async call via task)
-        nlp_result = enrich_nlp.apply_async(
-            args=(subject, body),
-            queue="enrichment",
-        ).get(timeout=10)
+        # Emails without links skip the URL step and get the bare NLP result
+        if not urls:
+            enrichment = {"nlp": enrichment}
         
+        nlp_result = enrichment.get("nlp") or {}
         text_score = float(nlp_result.get("text_ml_score", 0.0))
-        
-        # URL Analysis (async call via task)
-        url_result = enrich_urls.apply_async(
-            args=(urls,),
-            queue="enrichment",
-        ).get(timeout=10) if urls else {"score": 0.0, "signals": []}
+        url_result = enrichment.get("url") or {"score": 0.0, "signals": []}
         
         # Calculate risk score
         risk_eval = calculate_risk(
@@ -139,16 +232,11 @@ def process_email(
                         # Could also boost risk score or change decision here
                         logger.warning(
                             "anomaly_escalated",
-                            email_id=email_id,
                             anomaly_type=anomaly_result.get("anomaly_type"),
                         )
             
             except Exception as e:
-                logger.error(
-                    "anomaly_detection_error",
-                    email_id=email_id,
-                    error=str(e),
-                )
+                logger.error("anomaly_detection_error", error=str(e))
                 # Don't fail the whole process if anomaly detection fails
         
         # Determine category and decision (now considering anomalies)
@@ -162,29 +250,31 @@ def process_email(
             category = "COLD"
             decision = "ALLOW"
         
-        # Persist decision
-        persist_decision.apply_async(
-            args=(
-                email_id,
-                tenant_id,
-                risk_score,
-                category,
-                decision,
-                json.dumps(findings),
-            ),
-            queue="emails",
-        )
-        
-        # Queue enforcement action if needed
-        if category in ("WARM", "HOT"):
-            enforce_decision.apply_async(
-                args=(email_id, category, decision),
-                queue="enforcement",
-            )
+        # Persist decision at the priority the email was sent with
+        amqp_priority = (self.request.delivery_info or {}).get("priority")
+        persist = persist_decision.si(
+            email_id,
+            tenant_id,
+            risk_score,
+            category,
+            decision,
+            _dumps(findings),
+        ).set(queue="emails", priority=amqp_priority)
+        
+        # Queue enforcement action if needed, chained so that its claim
+        # runs only after the decision row has been committed
+        if category in _ENFORCE_CATEGORIES:
+            chain(
+                persist,
+                enforce_decision.si(email_id, category, decision).set(
+                    queue="enforcement", priority=amqp_priority
+                ),
+            ).apply_async()
+        else:
+            persist.apply_async()
         
         logger.info(
             "email_processing_complete",
-            email_id=email_id,
             risk_score=risk_score,
             category=category,
             decision=decision,
@@ -201,12 +291,14 @@ def process_email(
     except Exception as exc:
         logger.error(
             "email_processing_failed",
-            email_id=email_id,
             error=str(exc),
             retry_count=self.request.retries,
         )
         # Retry with exponential backoff
         raise self.retry(exc=exc, countdown=2 ** self.request.retries)
+    
+    finally:
+        clear_contextvars()
 
 
 # ========================================
@@ -224,7 +316,7 @@ def enrich_nlp(self, subject: str, body: str) -> Dict[str, Any]:
     Includes circuit breaker pattern.
     """
     try:
-        from app_new import call_nlp_service
+        _bind_app_helpers()
         
         result = call_nlp_service(subject, body)
         return result
@@ -241,6 +333,13 @@ def enrich_nlp(self, subject: str, body: str) -> Dict[str, Any]:
         return {"text_ml_score": 0.0, "model_version": "fallback"}
 
 
+def _analyze_email_urls(urls: List[str]) -> Dict[str, Any]:
+    """Run the URL model, skipping emails without links"""
+    if not urls:
+        return {"score": 0.0, "signals": []}
+    return analyze_urls(urls)
+
+
 @celery_app.task(
     bind=True,
     queue="enrichment",
@@ -251,13 +350,7 @@ def enrich_urls(self, urls: List[str]) -> Dict[str, Any]:
     Analyze URLs using ML model and reputation checks.
     """
     try:
-        from scanner.url_ml_v2 import analyze_urls
-        
-        if not urls:
-            return {"score": 0.0, "signals": []}
-        
-        result = analyze_urls(urls)
-        return result
+        return _analyze_email_urls(urls)
         
     except Exception as exc:
         logger.warning(
@@ -270,6 +363,35 @@ def enrich_urls(self, urls: List[str]) -> Dict[str, Any]:
         return {"score": 0.0, "signals": []}
 
 
+@celery_app.task(
+    bind=True,
+    queue="enrichment",
+    max_retries=2,
+)
+def enrich_urls_after_nlp(
+    self,
+    nlp_result: Dict[str, Any],
+    urls: List[str],
+) -> Dict[str, Any]:
+    """
+    Chain step: analyze URLs and carry the upstream NLP result forward.
+    """
+    try:
+        url_result = _analyze_email_urls(urls)
+        
+    except Exception as exc:
+        logger.warning(
+            "url_enrichment_failed",
+            error=str(exc),
+            retry_count=self.request.retries,
+        )
+        if self.request.retries < 2:
+            raise self.retry(exc=exc, countdown=5)
+        url_result = {"score": 0.0, "signals": []}
+    
+    return {"nlp": nlp_result, "url": url_result}
+
+
 # ========================================
 # Persistence Tasks
 # ========================================
@@ -296,6 +418,7 @@ def persist_decision(
             INSERT INTO email_decisions
             (id, tenant_id, risk_score, category, decision, findings, created_at)
             VALUES (%s, %s, %s, %s, %s, %s, NOW())
+            ON CONFLICT (id) DO NOTHING
         """, (
             email_id,
             tenant_id,
@@ -305,8 +428,17 @@ def persist_decision(
             findings,
         ))
         
+        if cur.rowcount == 0:
+            # Redelivered or retried task: the decision, its alert and its
+            # audit entry were committed together on the first run
+            conn.rollback()
+            cur.close()
+            conn.close()
+            logger.info("decision_persist_duplicate", email_id=email_id)
+            return True
+        
         # Create SOC alert if warm or hot
-        if category in ("WARM", "HOT"):
+        if category in _ENFORCE_CATEGORIES:
             cur.execute("""
                 INSERT INTO soc_alerts (id, tenant_id, email_id, category, status, created_at)
                 VALUES (%s, %s, %s, %s, %s, NOW())
@@ -327,8 +459,8 @@ def persist_decision(
             "email_decision",
             email_id,
             "created",
-            json.dumps({"source": "system", "service": "phishx"}),
-            json.dumps({"risk_score": risk_score, "category": category}),
+            Json({"source": "system", "service": "phishx"}, dumps=_dumps),
+            Json({"risk_score": risk_score, "category": category}, dumps=_dumps),
         ))
         
         conn.commit()
@@ -371,22 +503,32 @@ def enforce_decision(
     Includes retry logic for transient failures.
     """
     try:
-        # Get email details from database
         conn = get_db()
         cur = conn.cursor()
         
+        # Claim the decision in one round trip so concurrent workers
+        # never act on the same email twice. Retries keep the Celery task
+        # id, so a retry takes back the row it claimed before failing.
         cur.execute("""
-            SELECT tenant_id, findings FROM email_decisions WHERE id = %s
-        """, (email_id,))
+            UPDATE email_decisions
+            SET enforcement_state = 'queued', enforcement_task_id = %s, updated_at = NOW()
+            WHERE id = %s
+              AND (enforcement_state IS NULL
+                   OR enforcement_state = 'pending'
+                   OR (enforcement_state = 'queued' AND enforcement_task_id = %s))
+            RETURNING tenant_id
+        """, (self.request.id, email_id, self.request.id))
         
         row = cur.fetchone()
+        conn.commit()
+        
         if not row:
-            logger.warning("email_not_found_for_enforcement", email_id=email_id)
+            # Missing, or already claimed or enforced by another task
+            cur.close()
+            conn.close()
+            logger.warning("enforcement_not_claimed", email_id=email_id)
             return False
         
-        cur.close()
-        conn.close()
-        
         # Execute enforcement based on category
         if category == "HOT" and decision == "QUARANTINE":
             # These would call adapter handlers
@@ -396,6 +538,15 @@ def enforce_decision(
                 action="quarantine",
             )
         
+        cur.execute("""
+            UPDATE email_decisions
+            SET enforcement_state = 'done', updated_at = NOW()
+            WHERE id = %s AND enforcement_task_id = %s
+        """, (email_id, self.request.id))
+        conn.commit()
+        cur.close()
+        conn.close()
+        
         return True
         
     except Exception as exc:
@@ -407,13 +558,34 @@ def enforce_decision(
         )
         if self.request.retries < 3:
             raise self.retry(exc=exc, countdown=30 * (2 ** self.request.retries))
+        _mark_enforcement_failed(email_id, self.request.id)
         return False
 
 
+def _mark_enforcement_failed(email_id: str, task_id: str) -> None:
+    """Move a claim whose retries are exhausted to 'failed' (best effort)"""
+    try:
+        conn = get_db()
+        cur = conn.cursor()
+        cur.execute("""
+            UPDATE email_decisions
+            SET enforcement_state = 'failed', updated_at = NOW()
+            WHERE id = %s AND enforcement_state = 'queued' AND enforcement_task_id = %s
+        """, (email_id, task_id))
+        conn.commit()
+        cur.close()
+        conn.close()
+    except Exception as e:
+        logger.error("enforcement_state_update_failed", email_id=email_id, error=str(e))
+
+
 # ========================================
 # Maintenance Tasks
 # ========================================
 
+CLEANUP_BATCH_SIZE = 5000
+CLEANUP_BATCH_PAUSE_SECONDS = 0.05
+
 @celery_app.task()
 def cleanup_expired_alerts() -> int:
     """
@@ -426,14 +598,27 @@ def cleanup_expired_alerts() -> int:
         
         cutoff_date = datetime.utcnow() - timedelta(days=90)
         
-        cur.execute("""
-            DELETE FROM soc_alerts
-            WHERE status = 'RESOLVED' AND created_at < %s
-            RETURNING id
-        """, (cutoff_date,))
+        # Delete in bounded batches, committing each one, so writers are
+        # never blocked behind a single long-running DELETE
+        deleted_count = 0
+        while True:
+            cur.execute("""
+                DELETE FROM soc_alerts
+                WHERE id IN (
+                    SELECT id FROM soc_alerts
+                    WHERE status = 'RESOLVED' AND created_at < %s
+                    LIMIT %s
+                )
+            """, (cutoff_date, CLEANUP_BATCH_SIZE))
+            
+            batch_count = cur.rowcount
+            conn.commit()
+            deleted_count += batch_count
+            
+            if batch_count < CLEANUP_BATCH_SIZE:
+                break
+            time.sleep(CLEANUP_BATCH_PAUSE_SECONDS)
         
-        deleted_count = cur.rowcount
-        conn.commit()
         cur.close()
         conn.close()
         
@@ -13,11 +13,17 @@ import signal
 import asyncio
 import time
 import threading
+from collections import defaultdict
 from functools import wraps
-from typing import Callable, Any, Optional
+from types import MappingProxyType
+from typing import Callable, Any, Mapping, Optional
 from contextlib import asynccontextmanager
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from log_config import logger
+from metrics import operation_timeouts_total
 
 # ========================================
 # Timeout Configuration
@@ -45,20 +51,22 @@ class TimeoutConfig:
     # Queue operation timeout
     QUEUE_OPERATION_TIMEOUT = 5  # seconds
     
-    @classmethod
-    def get_timeout(cls, operation_type: str) -> int:
+    # Operation type -> timeout, built once
+    _TIMEOUT_MAP: Mapping[str, int] = MappingProxyType({
+        "nlp": NLP_SERVICE_TIMEOUT,
+        "url_analyzer": URL_ANALYZER_TIMEOUT,
+        "clamav": CLAMAV_TIMEOUT,
+        "database_query": DATABASE_QUERY_TIMEOUT,
+        "database_connection": DATABASE_CONNECTION_TIMEOUT,
+        "task": TASK_SOFT_TIMEOUT,
+        "api_request": API_REQUEST_TIMEOUT,
+        "queue": QUEUE_OPERATION_TIMEOUT,
+    })
+    
+    @staticmethod
+    def get_timeout(operation_type: str) -> int:
         """Get timeout for operation type"""
-        timeouts = {
-            "nlp": cls.NLP_SERVICE_TIMEOUT,
-            "url_analyzer": cls.URL_ANALYZER_TIMEOUT,
-            "clamav": cls.CLAMAV_TIMEOUT,
-            "database_query": cls.DATABASE_QUERY_TIMEOUT,
-            "database_connection": cls.DATABASE_CONNECTION_TIMEOUT,
-            "task": cls.TASK_SOFT_TIMEOUT,
-            "api_request": cls.API_REQUEST_TIMEOUT,
-            "queue": cls.QUEUE_OPERATION_TIMEOUT,
-        }
-        return timeouts.get(operation_type, 5)
+        return TimeoutConfig._TIMEOUT_MAP.get(operation_type, 5)
 
 
 # ========================================
@@ -70,34 +78,69 @@ class TimeoutError(Exception):
     pass
 
 
+# asyncio.timeout() is only available on Python 3.11+
+_aio_timeout = getattr(asyncio, "timeout", None)
+
+
 @asynccontextmanager
 async def async_timeout(timeout_seconds: float, operation: str = "operation"):
     """
     Async context manager for timeout handling.
     
+    The awaited body is cancelled when the deadline passes and the
+    cancellation is surfaced as TimeoutError.
+    
     Usage:
         async with async_timeout(5, "nlp_service"):
             result = await nlp_service.predict(text)
     """
-    async def timeout_handler():
-        await asyncio.sleep(timeout_seconds)
+    try:
+        if _aio_timeout is not None:
+            async with _aio_timeout(timeout_seconds):
+                yield
+        else:
+            # Python < 3.11: cancel the enclosing task once the deadline passes
+            task = asyncio.current_task()
+            expired = []
+            
+            def _expire():
+                expired.append(True)
+                task.cancel()
+            
+            handle = asyncio.get_running_loop().call_later(timeout_seconds, _expire)
+            try:
+                yield
+            except asyncio.CancelledError:
+                if expired:
+                    raise asyncio.TimeoutError()
+                raise
+            finally:
+                handle.cancel()
+    except asyncio.TimeoutError:
+        logger.warning(
+            "async_operation_timeout",
+            operation=operation,
+            timeout_seconds=timeout_seconds,
+        )
         raise TimeoutError(f"{operation} exceeded {timeout_seconds}s timeout")
+
+
+async def run_with_timeout(awaitable, timeout_seconds: float, operation: str = "operation"):
+    """
+    Await a single coroutine with timeout handling.
     
-    task = None
+    Usage:
+        result = await run_with_timeout(nlp_service.predict(text), 5, "nlp_service")
+    """
     try:
-        # Create timeout task
-        task = asyncio.create_task(timeout_handler())
-        yield
-    except TimeoutError:
+        return await asyncio.wait_for(awaitable, timeout_seconds)
+    except asyncio.TimeoutError:
         logger.warning(
             "async_operation_timeout",
             operation=operation,
             timeout_seconds=timeout_seconds,
         )
-        raise
-    finally:
-        if task:
-            task.cancel()
+        raise TimeoutError(f"{operation} exceeded {timeout_seconds}s timeout")
 
 
 # ========================================
@@ -191,17 +234,34 @@ def with_timeout(timeout_seconds: float, operation: str = ""):
 # Requests Timeout Wrapper
 # ========================================
 
+def _build_http_session() -> requests.Session:
+    """Shared session so outbound calls reuse pooled keep-alive connections"""
+    session = requests.Session()
+    for prefix in ("http://", "https://"):
+        session.mount(
+            prefix,
+            HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=256,
+                # 0 -> Retry(0, read=False): a read timeout stays a ReadTimeout
+                max_retries=0,
+            ),
+        )
+    return session
+
+
+_SESSION = _build_http_session()
+
+
 class RequestWithTimeout:
     """Wrapper for requests library with timeout"""
     
     @staticmethod
     def get(url: str, timeout: float = 5, **kwargs) -> dict:
         """GET request with timeout"""
-        import requests
-        
         try:
             start_time = time.time()
-            response = requests.get(url, timeout=timeout, **kwargs)
+            response = _SESSION.get(url, timeout=timeout, **kwargs)
             elapsed = time.time() - start_time
             
             logger.debug(
@@ -232,11 +292,9 @@ class RequestWithTimeout:
     @staticmethod
     def post(url: str, timeout: float = 5, **kwargs) -> dict:
         """POST request with timeout"""
-        import requests
-        
         try:
             start_time = time.time()
-            response = requests.post(url, timeout=timeout, **kwargs)
+            response = _SESSION.post(url, timeout=timeout, **kwargs)
             elapsed = time.time() - start_time
             
             logger.debug(
@@ -280,8 +338,9 @@ class DatabaseQueryTimeout:
         try:
             start_time = time.time()
             
-            # Set statement timeout (PostgreSQL)
-            cursor.execute(f"SET statement_timeout = {int(timeout * 1000)}")
+            # SET LOCAL ends with the current transaction, so the timeout
+            # never outlives this query's transaction on a shared connection
+            cursor.execute(f"SET LOCAL statement_timeout = {int(timeout * 1000)}")
             
             cursor.execute(query, params)
             
@@ -352,20 +411,19 @@ class TaskTimeoutManager:
 class TimeoutMetrics:
     """Track timeout metrics"""
     
-    timeouts_by_operation = {}
+    # Constant-size counters per operation
+    timeouts_by_operation = defaultdict(lambda: {"count": 0, "last_ts": None})
     timeout_lock = threading.Lock()
     
     @classmethod
     def record_timeout(cls, operation: str, timeout_seconds: float):
         """Record a timeout occurrence"""
         with cls.timeout_lock:
-            if operation not in cls.timeouts_by_operation:
-                cls.timeouts_by_operation[operation] = []
-            
-            cls.timeouts_by_operation[operation].append({
-                "timestamp": time.time(),
-                "timeout_seconds": timeout_seconds,
-            })
+            entry = cls.timeouts_by_operation[operation]
+            entry["count"] += 1
+            entry["last_ts"] = time.time()
+        
+        operation_timeouts_total.labels(operation=operation).inc()
         
         logger.warning(
             "timeout_recorded",
@@ -378,10 +436,10 @@ class TimeoutMetrics:
         """Get timeout statistics"""
         with cls.timeout_lock:
             stats = {}
-            for operation, timeouts in cls.timeouts_by_operation.items():
+            for operation, entry in cls.timeouts_by_operation.items():
                 stats[operation] = {
-                    "count": len(timeouts),
-                    "last_timeout": timeouts[-1]["timestamp"] if timeouts else None,
+                    "count": entry["count"],
+                    "last_timeout": entry["last_ts"],
                 }
             return stats
 
@@ -14,156 +14,327 @@ Checks for:
 import os
 import sys
 import re
+import argparse
+import json
 from pathlib import Path
 from urllib.parse import urlparse
-import base64
 
 
-class Colors:
-    """ANSI colors for terminal output"""
-    GREEN = '\033[92m'
-    RED = '\033[91m'
-    YELLOW = '\033[93m'
-    BLUE = '\033[94m'
-    RESET = '\033[0m'
-    BOLD = '\033[1m'
+# Literal placeholder tokens are checked with `in`; only the structured
+# [...] form needs the regex. Bounded ([^\]]*) to avoid backtracking.
+_PLACEHOLDER_TOKENS = ('YOUR_', 'CHANGE_ME')
+_BRACKET_PLACEHOLDER_RE = re.compile(r'\[[^\]]*\]')
+
+# KEY=value lines; comments never match the key anchor. [ \t] rather than \s
+# so an empty value cannot swallow the following line.
+_ENV_LINE_RE = re.compile(
+    r'^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t]*$', re.M
+)
+
+
+def _has_placeholder(value):
+    """True if value still holds a YOUR_/CHANGE_ME/[...] placeholder"""
+    for token in _PLACEHOLDER_TOKENS:
+        if token in value:
+            return True
+    return '[' in value and _BRACKET_PLACEHOLDER_RE.search(value) is not None
+
+
+_HTTPS_PREFIX = 'https://'
+
+# Standard base64 alphabet with up to two '=' of padding
+_B64_RE = re.compile(r'[A-Za-z0-9+/]*={0,2}')
+
+
+# Value-level validators as (predicate flagging a bad value, label), applied
+# in one pass over the config so new per-value checks share the traversal
+_VALUE_VALIDATORS = ((_has_placeholder, 'placeholder'),)
+
+
+# Character-class bits for password strength checks
+_CLASS_UPPER, _CLASS_LOWER, _CLASS_DIGIT, _CLASS_SPECIAL = 1, 2, 4, 8
+_ALL_CLASSES = _CLASS_UPPER | _CLASS_LOWER | _CLASS_DIGIT | _CLASS_SPECIAL
+
+
+def _classify_char(c):
+    """Class bit for a single character (0 for other alphanumerics)"""
+    if c.isupper():
+        return _CLASS_UPPER
+    if c.islower():
+        return _CLASS_LOWER
+    if c.isdigit():
+        return _CLASS_DIGIT
+    if not c.isalnum():
+        return _CLASS_SPECIAL
+    return 0
+
+
+_ASCII_DIGITS = b'0123456789'
+
+
+def _char_class_mask(password):
+    """Bitmask of the character classes present in password"""
+    mask = 0
+    if password.isascii():
+        # ASCII case mapping is exact, so each class is one whole-string C op
+        if password != password.lower():
+            mask |= _CLASS_UPPER
+        if password != password.upper():
+            mask |= _CLASS_LOWER
+        if len(password.encode('ascii').translate(None, _ASCII_DIGITS)) != len(password):
+            mask |= _CLASS_DIGIT
+        if password and not password.isalnum():
+            mask |= _CLASS_SPECIAL
+        return mask
+
+    for c in password:
+        mask |= _classify_char(c)
+        if mask == _ALL_CLASSES:
+            break
+    return mask
+
+
+# ANSI colors for terminal output
+GREEN = '\033[92m'
+RED = '\033[91m'
+YELLOW = '\033[93m'
+BLUE = '\033[94m'
+RESET = '\033[0m'
+BOLD = '\033[1m'
+
+
+# Pre-formatted line prefixes and header bar
+_PREFIX_OK = f"{GREEN}✅{RESET} "
+_PREFIX_ERR = f"{RED}❌{RESET} "
+_PREFIX_WARN = f"{YELLOW}⚠️ {RESET} "
+_PREFIX_INFO = f"{BLUE}ℹ️ {RESET} "
+_HEADER_BAR = f"{BOLD}{BLUE}{'=' * 60}{RESET}"
 
 
 def print_success(msg):
-    print(f"{Colors.GREEN}✅{Colors.RESET} {msg}")
+    sys.stdout.write(f"{_PREFIX_OK}{msg}\n")
 
 
 def print_error(msg):
-    print(f"{Colors.RED}❌{Colors.RESET} {msg}")
+    sys.stdout.write(f"{_PREFIX_ERR}{msg}\n")
 
 
 def print_warning(msg):
-    print(f"{Colors.YELLOW}⚠️ {Colors.RESET} {msg}")
+    sys.stdout.write(f"{_PREFIX_WARN}{msg}\n")
 
 
 def print_info(msg):
-    print(f"{Colors.BLUE}ℹ️ {Colors.RESET} {msg}")
+    sys.stdout.write(f"{_PREFIX_INFO}{msg}\n")
 
 
 def print_header(msg):
-    print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*60}{Colors.RESET}")
-    print(f"{Colors.BOLD}{msg}{Colors.RESET}")
-    print(f"{Colors.BOLD}{Colors.BLUE}{'='*60}{Colors.RESET}")
+    sys.stdout.write(f"\n{_HEADER_BAR}\n{BOLD}{msg}{RESET}\n{_HEADER_BAR}\n")
+
+
+# Variables that must be set, with descriptions for error messages
+_REQUIRED_VARS = {
+    'ENVIRONMENT': 'Environment type',
+    'DATABASE_URL': 'Database connection string',
+    'POSTGRES_PASSWORD': 'PostgreSQL password',
+    'REDIS_URL': 'Redis connection URL',
+    'ENCRYPTION_MASTER_KEY': 'Encryption key',
+    'JWT_ALGORITHM': 'JWT algorithm',
+    'ENABLE_JWT_AUTH': 'JWT auth enabled flag',
+    'GRAFANA_ADMIN_PASSWORD': 'Grafana admin password',
+    'SMTP_PASSWORD': 'SMTP/email password',
+}
+
+
+# Secrets checked for length and character diversity
+_PASSWORD_VARS = {
+    'POSTGRES_PASSWORD': 'Database',
+    'REDIS_PASSWORD': 'Redis',
+    'GRAFANA_ADMIN_PASSWORD': 'Grafana',
+    'SMTP_PASSWORD': 'SMTP/Email',
+}
+
+
+# Phase 3 feature flags reported as enabled/disabled
+_PHASE3_FEATURES = {
+    'ENCRYPTION_ENABLED': 'Field-level encryption',
+    'ENABLE_JWT_AUTH': 'JWT authentication',
+    'ANOMALY_DETECTION_ENABLED': 'Anomaly detection',
+    'SHADOW_MODELS_ENABLED': 'Shadow models (A/B testing)',
+    'MULTI_REGION_ENABLED': 'Multi-region failover',
+}
+
+
+# Security flags: (description, expected value or predicate)
+_SECURITY_SETTINGS = {
+    'ENABLE_HTTPS': ('HTTPS enabled', True),
+    'CSRF_PROTECTION_ENABLED': ('CSRF protection enabled', True),
+    'RATE_LIMIT_ENABLED': ('Rate limiting enabled', True),
+    'AUDIT_LOG_ENABLED': ('Audit logging enabled', True),
+    'SSL_VERIFY_MODE': ('SSL certificate verification', lambda x: x == 'CERT_REQUIRED'),
+}
 
 
 class EnvValidator:
     """Validates .env.production configuration"""
 
-    def __init__(self, env_file=".env.production"):
+    __slots__ = (
+        'env_file', 'config', 'errors', 'warnings', 'successes',
+        'stream', 'json_file', '_out', '_failed',
+    )
+
+    def __init__(self, env_file=".env.production", stream=False, json_file=None):
         self.env_file = env_file
         self.config = {}
         self.errors = []
         self.warnings = []
         self.successes = []
+        self.stream = stream
+        self.json_file = json_file  # machine-readable summary path, if any
+        self._out = []
+        self._failed = set()  # keys already reported as errors
+
+    # ========================================
+    # Output (buffered unless streaming)
+    # ========================================
+
+    def _emit(self, text):
+        """Write text now when streaming, otherwise buffer it"""
+        if self.stream:
+            sys.stdout.write(text)
+        else:
+            self._out.append(text)
+
+    def _flush(self):
+        """Write buffered output in one call"""
+        if self._out:
+            sys.stdout.write(''.join(self._out))
+            self._out.clear()
+
+    def _log_success(self, msg):
+        self.successes.append(msg)
+        self._emit(f"{_PREFIX_OK}{msg}\n")
+
+    def _log_error(self, msg):
+        self._emit(f"{_PREFIX_ERR}{msg}\n")
+
+    def _log_warning(self, msg):
+        self._emit(f"{_PREFIX_WARN}{msg}\n")
+
+    def _log_info(self, msg):
+        self._emit(f"{_PREFIX_INFO}{msg}\n")
+
+    def _log_header(self, msg):
+        self._emit(f"\n{_HEADER_BAR}\n{BOLD}{msg}{RESET}\n{_HEADER_BAR}\n")
+
+    def _already_failed(self, key):
+        """True (noting the skip) if an earlier check already reported key"""
+        if key in self._failed:
+            self._log_info(f"{key}: skipped (already reported)")
+            return True
+        return False
+
+    # ========================================
+    # Loading
+    # ========================================
 
     def load_env(self):
         """Load .env.production file"""
-        if not Path(self.env_file).exists():
-            print_error(f"File not found: {self.env_file}")
+        env_path = Path(self.env_file)
+        if not env_path.exists():
+            self._log_error(f"File not found: {self.env_file}")
             return False
 
         try:
-            with open(self.env_file, 'r', encoding='utf-8-sig') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        self.config[key.strip()] = value.strip()
-            print_success(f"Loaded {len(self.config)} variables from {self.env_file}")
+            data = env_path.read_text(encoding='utf-8-sig')
+            self.config = dict(_ENV_LINE_RE.findall(data))
+            self._log_success(f"Loaded {len(self.config)} variables from {self.env_file}")
             return True
         except Exception as e:
-            print_error(f"Failed to load {self.env_file}: {e}")
+            self._log_error(f"Failed to load {self.env_file}: {e}")
             return False
 
     def get(self, key, default=None):
         """Get config value"""
         return self.config.get(key, default)
 
+    # ========================================
+    # Checks
+    # ========================================
+
     def check_required_vars(self):
         """Check all required variables are present"""
-        print_header("Checking Required Variables")
-
-        required = {
-            'ENVIRONMENT': 'Environment type',
-            'DATABASE_URL': 'Database connection string',
-            'POSTGRES_PASSWORD': 'PostgreSQL password',
-            'REDIS_URL': 'Redis connection URL',
-            'ENCRYPTION_MASTER_KEY': 'Encryption key',
-            'JWT_ALGORITHM': 'JWT algorithm',
-            'ENABLE_JWT_AUTH': 'JWT auth enabled flag',
-            'GRAFANA_ADMIN_PASSWORD': 'Grafana admin password',
-            'SMTP_PASSWORD': 'SMTP/email password',
-        }
-
-        for var, description in required.items():
-            value = self.get(var)
-            if not value:
-                self.errors.append(f"Missing required variable: {var} ({description})")
-                print_error(f"{var}: MISSING")
-            else:
-                print_success(f"{var}: present")
+        self._log_header("Checking Required Variables")
+        get = self.config.get
+
+        missing = [var for var in _REQUIRED_VARS if not get(var)]
+        self._failed.update(missing)
+        for var in missing:
+            self.errors.append(f"Missing required variable: {var} ({_REQUIRED_VARS[var]})")
+            self._log_error(f"{var}: MISSING")
+
+        present = len(_REQUIRED_VARS) - len(missing)
+        if missing:
+            self._log_info(f"{present}/{len(_REQUIRED_VARS)} required variables present")
+        else:
+            self._log_success(f"All {len(_REQUIRED_VARS)} required variables present")
 
     def check_no_placeholders(self):
         """Check no [CHANGE_ME_*] placeholders remain"""
-        print_header("Checking for Placeholders")
-
-        placeholder_patterns = [
-            r'\[CHANGE_ME[^\]]*\]',
-            r'\[YOUR_[^\]]*\]',
-            r'YOUR_',
-            r'CHANGE_ME',
-            r'\[.*\]',
-        ]
+        self._log_header("Checking for Placeholders")
 
+        # Single traversal; each value is run past every value validator
         for key, value in self.config.items():
-            for pattern in placeholder_patterns:
-                if re.search(pattern, str(value)):
+            flagged = False
+            for is_bad, label in _VALUE_VALIDATORS:
+                if is_bad(value):
+                    flagged = True
                     self.warnings.append(
-                        f"{key} contains placeholder: {value[:50]}..."
+                        f"{key} contains {label}: {value[:50]}..."
                     )
-                    print_warning(f"{key}: Contains placeholder value")
-                    break
-            else:
-                print_success(f"{key}: No placeholders")
+                    self._log_warning(f"{key}: Contains {label} value")
+            if not flagged:
+                self._log_success(f"{key}: No placeholders")
 
     def check_environment_type(self):
         """Validate ENVIRONMENT setting"""
-        print_header("Validating Environment Type")
+        self._log_header("Validating Environment Type")
+        get = self.config.get
+        if self._already_failed('ENVIRONMENT'):
+            return
 
-        env = self.get('ENVIRONMENT')
+        env = get('ENVIRONMENT')
         if env not in ['development', 'staging', 'production']:
             self.errors.append(f"Invalid ENVIRONMENT: {env} (must be production/staging/development)")
-            print_error(f"ENVIRONMENT={env} is not valid for production")
+            self._log_error(f"ENVIRONMENT={env} is not valid for production")
         elif env != 'production':
             self.warnings.append(f"ENVIRONMENT is '{env}', not 'production'")
-            print_warning(f"ENVIRONMENT is set to '{env}' instead of 'production'")
+            self._log_warning(f"ENVIRONMENT is set to '{env}' instead of 'production'")
         else:
-            print_success("ENVIRONMENT=production")
+            self._log_success("ENVIRONMENT=production")
 
     def check_debug_mode(self):
         """Check DEBUG is false in production"""
-        print_header("Validating Safety Settings")
+        self._log_header("Validating Safety Settings")
+        get = self.config.get
 
-        debug = self.get('DEBUG', '').lower()
+        debug = get('DEBUG', '').lower()
         if debug != 'false':
             self.warnings.append(f"DEBUG is enabled in production ({debug})")
-            print_warning(f"DEBUG={debug} (should be false in production)")
+            self._log_warning(f"DEBUG={debug} (should be false in production)")
         else:
-            print_success("DEBUG=false (safe)")
+            self._log_success("DEBUG=false (safe)")
 
     def check_database_url(self):
         """Validate DATABASE_URL format"""
-        print_header("Validating Database Configuration")
+        self._log_header("Validating Database Configuration")
+        get = self.config.get
+        if self._already_failed('DATABASE_URL'):
+            return
 
-        db_url = self.get('DATABASE_URL')
+        db_url = get('DATABASE_URL')
         if not db_url:
             self.errors.append("DATABASE_URL is missing")
-            print_error("DATABASE_URL: MISSING")
+            self._log_error("DATABASE_URL: MISSING")
             return
 
         try:
@@ -171,194 +342,191 @@ class EnvValidator:
             # Accept common postgres schemes
             if parsed.scheme not in ('postgresql', 'postgres'):
                 self.errors.append(f"Invalid database scheme: {parsed.scheme} (must be postgresql)")
-                print_error(f"DATABASE_URL scheme is '{parsed.scheme}' not 'postgresql'")
+                self._log_error(f"DATABASE_URL scheme is '{parsed.scheme}' not 'postgresql'")
                 return
 
             if not parsed.hostname:
                 self.errors.append("DATABASE_URL missing hostname")
-                print_error("DATABASE_URL: Missing hostname")
+                self._log_error("DATABASE_URL: Missing hostname")
                 return
 
             # urlparse stores the database name in the path (e.g. '/dbname')
             dbname = parsed.path.lstrip('/') if parsed.path else ''
             if not dbname:
                 self.errors.append("DATABASE_URL missing database name")
-                print_error("DATABASE_URL: Missing database name")
+                self._log_error("DATABASE_URL: Missing database name")
                 return
 
-            print_success(f"DATABASE_URL format valid")
-            print_info(f"  Host: {parsed.hostname}")
-            print_info(f"  Database: {dbname}")
-            print_info(f"  Port: {parsed.port or 5432}")
+            self._log_success(f"DATABASE_URL format valid")
+            self._log_info(f"  Host: {parsed.hostname}")
+            self._log_info(f"  Database: {dbname}")
+            self._log_info(f"  Port: {parsed.port or 5432}")
         except Exception as e:
             self.errors.append(f"Failed to parse DATABASE_URL: {e}")
-            print_error(f"DATABASE_URL parsing failed: {e}")
+            self._log_error(f"DATABASE_URL parsing failed: {e}")
 
     def check_redis_url(self):
         """Validate REDIS_URL format"""
-        print_header("Validating Redis Configuration")
+        self._log_header("Validating Redis Configuration")
+        get = self.config.get
+        if self._already_failed('REDIS_URL'):
+            return
 
-        redis_url = self.get('REDIS_URL')
+        redis_url = get('REDIS_URL')
         if not redis_url:
             self.errors.append("REDIS_URL is missing")
-            print_error("REDIS_URL: MISSING")
+            self._log_error("REDIS_URL: MISSING")
             return
 
         try:
             parsed = urlparse(redis_url)
             if parsed.scheme != 'redis':
                 self.errors.append(f"Invalid Redis scheme: {parsed.scheme}")
-                print_error(f"REDIS_URL scheme is '{parsed.scheme}' not 'redis'")
+                self._log_error(f"REDIS_URL scheme is '{parsed.scheme}' not 'redis'")
             elif not parsed.hostname:
                 self.errors.append("REDIS_URL missing hostname")
-                print_error("REDIS_URL: Missing hostname")
+                self._log_error("REDIS_URL: Missing hostname")
             else:
-                print_success(f"REDIS_URL format valid")
-                print_info(f"  Host: {parsed.hostname}")
-                print_info(f"  Port: {parsed.port or 6379}")
+                self._log_success(f"REDIS_URL format valid")
+                self._log_info(f"  Host: {parsed.hostname}")
+                self._log_info(f"  Port: {parsed.port or 6379}")
         except Exception as e:
             self.errors.append(f"Failed to parse REDIS_URL: {e}")
-            print_error(f"REDIS_URL parsing failed: {e}")
+            self._log_error(f"REDIS_URL parsing failed: {e}")
 
     def check_encryption_key(self):
         """Validate encryption master key"""
-        print_header("Validating Encryption Configuration")
+        self._log_header("Validating Encryption Configuration")
+        get = self.config.get
+        if self._already_failed('ENCRYPTION_MASTER_KEY'):
+            return
 
-        enc_key = self.get('ENCRYPTION_MASTER_KEY')
+        enc_key = get('ENCRYPTION_MASTER_KEY')
         if not enc_key:
-            if self.get('ENCRYPTION_ENABLED', '').lower() == 'true':
+            if get('ENCRYPTION_ENABLED', '').lower() == 'true':
                 self.errors.append("ENCRYPTION_ENABLED=true but ENCRYPTION_MASTER_KEY missing")
-                print_error("ENCRYPTION_MASTER_KEY: MISSING (but ENCRYPTION_ENABLED=true)")
+                self._log_error("ENCRYPTION_MASTER_KEY: MISSING (but ENCRYPTION_ENABLED=true)")
             else:
-                print_warning("ENCRYPTION_MASTER_KEY not set (encryption may not work)")
+                self._log_warning("ENCRYPTION_MASTER_KEY not set (encryption may not work)")
             return
 
-        # Check format (should be 64 hex characters = 32 bytes)
-        if re.match(r'^[0-9a-fA-F]{64}$', enc_key):
-            print_success(f"ENCRYPTION_MASTER_KEY: Valid hex format (32 bytes)")
+        # Check format (should be 64 hex characters = 32 bytes).
+        # fromhex skips whitespace, so also require all 64 chars to decode.
+        try:
+            is_hex64 = len(enc_key) == 64 and len(bytes.fromhex(enc_key)) == 32
+        except ValueError:
+            is_hex64 = False
+
+        if is_hex64:
+            self._log_success(f"ENCRYPTION_MASTER_KEY: Valid hex format (32 bytes)")
         else:
             self.warnings.append(f"ENCRYPTION_MASTER_KEY format unexpected (not 64 hex chars)")
-            print_warning(f"ENCRYPTION_MASTER_KEY: Format check warning (got {len(enc_key)} chars)")
+            self._log_warning(f"ENCRYPTION_MASTER_KEY: Format check warning (got {len(enc_key)} chars)")
 
     def check_jwt_configuration(self):
         """Validate JWT configuration"""
-        print_header("Validating JWT Configuration")
+        self._log_header("Validating JWT Configuration")
+        get = self.config.get
+        if self._already_failed('ENABLE_JWT_AUTH'):
+            return
 
-        jwt_auth = self.get('ENABLE_JWT_AUTH', '').lower()
+        jwt_auth = get('ENABLE_JWT_AUTH', '').lower()
         if jwt_auth != 'true':
             self.warnings.append("JWT_AUTH not enabled (enable in production)")
-            print_warning("ENABLE_JWT_AUTH is not 'true'")
+            self._log_warning("ENABLE_JWT_AUTH is not 'true'")
             return
 
-        print_success("ENABLE_JWT_AUTH=true")
+        self._log_success("ENABLE_JWT_AUTH=true")
+        if self._already_failed('JWT_ALGORITHM'):
+            return
 
-        algorithm = self.get('JWT_ALGORITHM')
+        algorithm = get('JWT_ALGORITHM')
         if algorithm == 'RS256':
             # Check for RSA keys
-            priv_key = self.get('JWT_PRIVATE_KEY')
-            pub_key = self.get('JWT_PUBLIC_KEY')
+            priv_key = get('JWT_PRIVATE_KEY')
+            pub_key = get('JWT_PUBLIC_KEY')
 
             if not priv_key:
                 self.errors.append("JWT_ALGORITHM=RS256 but JWT_PRIVATE_KEY missing")
-                print_error("JWT_PRIVATE_KEY: MISSING (required for RS256)")
+                self._log_error("JWT_PRIVATE_KEY: MISSING (required for RS256)")
             elif not pub_key:
                 self.errors.append("JWT_ALGORITHM=RS256 but JWT_PUBLIC_KEY missing")
-                print_error("JWT_PUBLIC_KEY: MISSING (required for RS256)")
+                self._log_error("JWT_PUBLIC_KEY: MISSING (required for RS256)")
             else:
-                # Validate base64 encoding
-                try:
-                    base64.b64decode(priv_key)
-                    base64.b64decode(pub_key)
-                    print_success("JWT_PRIVATE_KEY: Valid base64")
-                    print_success("JWT_PUBLIC_KEY: Valid base64")
-                except Exception as e:
-                    self.errors.append(f"JWT keys not valid base64: {e}")
-                    print_error(f"JWT keys base64 validation failed: {e}")
+                # Validate base64 encoding without decoding the keys
+                invalid = [
+                    name for name, key in (('JWT_PRIVATE_KEY', priv_key), ('JWT_PUBLIC_KEY', pub_key))
+                    if len(key) % 4 or not _B64_RE.fullmatch(key)
+                ]
+                if not invalid:
+                    self._log_success("JWT_PRIVATE_KEY: Valid base64")
+                    self._log_success("JWT_PUBLIC_KEY: Valid base64")
+                else:
+                    reason = f"{', '.join(invalid)} not padded standard base64"
+                    self.errors.append(f"JWT keys not valid base64: {reason}")
+                    self._log_error(f"JWT keys base64 validation failed: {reason}")
 
         elif algorithm == 'HS256':
-            secret = self.get('JWT_SECRET_KEY')
+            secret = get('JWT_SECRET_KEY')
             if not secret:
                 self.errors.append("JWT_ALGORITHM=HS256 but JWT_SECRET_KEY missing")
-                print_error("JWT_SECRET_KEY: MISSING (required for HS256)")
+                self._log_error("JWT_SECRET_KEY: MISSING (required for HS256)")
             elif len(secret) < 32:
                 self.errors.append(f"JWT_SECRET_KEY too short ({len(secret)} chars, need 32+)")
-                print_error(f"JWT_SECRET_KEY too short ({len(secret)} chars, minimum 32)")
+                self._log_error(f"JWT_SECRET_KEY too short ({len(secret)} chars, minimum 32)")
             else:
-                print_success(f"JWT_SECRET_KEY: Valid ({len(secret)} chars)")
+                self._log_success(f"JWT_SECRET_KEY: Valid ({len(secret)} chars)")
         else:
             self.errors.append(f"Invalid JWT_ALGORITHM: {algorithm} (must be RS256 or HS256)")
-            print_error(f"JWT_ALGORITHM='{algorithm}' invalid")
+            self._log_error(f"JWT_ALGORITHM='{algorithm}' invalid")
 
     def check_password_strength(self):
         """Check password strength"""
-        print_header("Validating Password Strength")
+        self._log_header("Validating Password Strength")
+        get = self.config.get
 
-        password_vars = {
-            'POSTGRES_PASSWORD': 'Database',
-            'REDIS_PASSWORD': 'Redis',
-            'GRAFANA_ADMIN_PASSWORD': 'Grafana',
-            'SMTP_PASSWORD': 'SMTP/Email',
-        }
-
-        for var, description in password_vars.items():
-            password = self.get(var)
+        for var, description in _PASSWORD_VARS.items():
+            if self._already_failed(var):
+                continue
+            password = get(var)
             if not password:
-                print_warning(f"{var}: NOT SET")
+                self._log_warning(f"{var}: NOT SET")
                 continue
 
             # Check minimum length
             if len(password) < 24:
                 self.warnings.append(f"{var} too short ({len(password)} chars, 40+ recommended)")
-                print_warning(f"{var}: Only {len(password)} chars (40+ recommended)")
+                self._log_warning(f"{var}: Only {len(password)} chars (40+ recommended)")
                 continue
 
             # Check character diversity
-            has_upper = any(c.isupper() for c in password)
-            has_lower = any(c.islower() for c in password)
-            has_digit = any(c.isdigit() for c in password)
-            has_special = any(not c.isalnum() for c in password)
-
-            complexity = sum([has_upper, has_lower, has_digit, has_special])
+            complexity = _char_class_mask(password).bit_count()
             
             if complexity < 3:
                 self.warnings.append(f"{var}: Low complexity (only {complexity}/4 character types)")
-                print_warning(f"{var}: Low complexity ({complexity}/4 types)")
+                self._log_warning(f"{var}: Low complexity ({complexity}/4 types)")
             else:
-                print_success(f"{var}: Strong ({len(password)} chars, {complexity}/4 types)")
+                self._log_success(f"{var}: Strong ({len(password)} chars, {complexity}/4 types)")
 
     def check_phase3_features(self):
         """Validate Phase 3 features"""
-        print_header("Validating Phase 3 Features")
-
-        features = {
-            'ENCRYPTION_ENABLED': 'Field-level encryption',
-            'ENABLE_JWT_AUTH': 'JWT authentication',
-            'ANOMALY_DETECTION_ENABLED': 'Anomaly detection',
-            'SHADOW_MODELS_ENABLED': 'Shadow models (A/B testing)',
-            'MULTI_REGION_ENABLED': 'Multi-region failover',
-        }
+        self._log_header("Validating Phase 3 Features")
+        get = self.config.get
 
-        for var, description in features.items():
-            value = self.get(var, 'false').lower()
+        for var, description in _PHASE3_FEATURES.items():
+            value = get(var, 'false').lower()
             status = '✅ ENABLED' if value == 'true' else '⚠️  DISABLED'
-            print_info(f"{description}: {status}")
+            self._log_info(f"{description}: {status}")
 
     def check_security_settings(self):
         """Check security-related settings"""
-        print_header("Validating Security Settings")
-
-        settings = {
-            'ENABLE_HTTPS': ('HTTPS enabled', True),
-            'CSRF_PROTECTION_ENABLED': ('CSRF protection enabled', True),
-            'RATE_LIMIT_ENABLED': ('Rate limiting enabled', True),
-            'AUDIT_LOG_ENABLED': ('Audit logging enabled', True),
-            'SSL_VERIFY_MODE': ('SSL certificate verification', lambda x: x == 'CERT_REQUIRED'),
-        }
+        self._log_header("Validating Security Settings")
+        get = self.config.get
 
-        for var, (description, check) in settings.items():
-            value = self.get(var)
+        for var, (description, check) in _SECURITY_SETTINGS.items():
+            value = get(var)
             if not value:
-                print_warning(f"{description}: NOT SET")
+                self._log_warning(f"{description}: NOT SET")
                 continue
 
             if callable(check):
@@ -367,89 +535,127 @@ class EnvValidator:
                 is_valid = value.lower() == str(check).lower()
 
             if is_valid:
-                print_success(f"{description}: ✅")
+                self._log_success(f"{description}: ✅")
             else:
-                print_warning(f"{description}: {value}")
+                self._log_warning(f"{description}: {value}")
 
     def check_cors_configuration(self):
         """Check CORS is properly configured"""
-        print_header("Validating CORS Configuration")
+        self._log_header("Validating CORS Configuration")
+        get = self.config.get
 
-        cors = self.get('CORS_ORIGINS')
+        cors = get('CORS_ORIGINS')
         if not cors:
             self.warnings.append("CORS_ORIGINS not set (defaulting to allow all)")
-            print_warning("CORS_ORIGINS: NOT SET")
+            self._log_warning("CORS_ORIGINS: NOT SET")
             return
 
         if cors == '*':
             self.warnings.append("CORS_ORIGINS=* (allows any origin - OK for dev, not for prod)")
-            print_warning("CORS_ORIGINS='*' (allows any origin)")
+            self._log_warning("CORS_ORIGINS='*' (allows any origin)")
         else:
             origins = cors.split(',')
-            if all(o.startswith('https://') for o in origins):
-                print_success(f"CORS_ORIGINS: {len(origins)} HTTPS origins configured")
+            bad = [o for o in origins if not o.startswith(_HTTPS_PREFIX)]
+            if not bad:
+                self._log_success(f"CORS_ORIGINS: {len(origins)} HTTPS origins configured")
                 for origin in origins:
-                    print_info(f"  - {origin}")
+                    self._log_info(f"  - {origin}")
             else:
-                self.warnings.append("Some CORS origins are not HTTPS")
-                print_warning("Some CORS origins are not HTTPS")
+                self.warnings.append(f"Some CORS origins are not HTTPS: {', '.join(bad)}")
+                self._log_warning("Some CORS origins are not HTTPS")
+                for origin in bad:
+                    self._log_info(f"  - {origin}")
 
     def generate_summary(self):
         """Generate validation summary"""
-        print_header("Validation Summary")
+        self._log_header("Validation Summary")
 
         total = len(self.successes) + len(self.warnings) + len(self.errors)
         
-        print(f"\nResults:")
-        print(f"  {Colors.GREEN}Checks passed: {len(self.successes)}{Colors.RESET}")
-        print(f"  {Colors.YELLOW}Warnings: {len(self.warnings)}{Colors.RESET}")
-        print(f"  {Colors.RED}Errors: {len(self.errors)}{Colors.RESET}")
+        self._emit(f"\nResults:\n")
+        self._emit(f"  {GREEN}Checks passed: {len(self.successes)}{RESET}\n")
+        self._emit(f"  {YELLOW}Warnings: {len(self.warnings)}{RESET}\n")
+        self._emit(f"  {RED}Errors: {len(self.errors)}{RESET}\n")
 
         if self.warnings:
-            print(f"\n{Colors.YELLOW}Warnings (review before deployment):{Colors.RESET}")
+            self._emit(f"\n{YELLOW}Warnings (review before deployment):{RESET}\n")
             for i, warning in enumerate(self.warnings, 1):
-                print(f"  {i}. {warning}")
+                self._emit(f"  {i}. {warning}\n")
 
         if self.errors:
-            print(f"\n{Colors.RED}Errors (must fix):{Colors.RESET}")
+            self._emit(f"\n{RED}Errors (must fix):{RESET}\n")
             for i, error in enumerate(self.errors, 1):
-                print(f"  {i}. {error}")
+                self._emit(f"  {i}. {error}\n")
 
-        print("\n" + "="*60)
+        if self.json_file:
+            self.write_json_summary(self.json_file)
+
+        self._emit("\n" + "="*60 + "\n")
         if self.errors:
-            print(f"{Colors.RED}{Colors.BOLD}❌ VALIDATION FAILED - Fix errors before deployment{Colors.RESET}")
-            return False
+            self._emit(f"{RED}{BOLD}❌ VALIDATION FAILED - Fix errors before deployment{RESET}\n")
         elif self.warnings:
-            print(f"{Colors.YELLOW}{Colors.BOLD}⚠️  VALIDATION PASSED WITH WARNINGS - Review before deployment{Colors.RESET}")
-            return True
+            self._emit(f"{YELLOW}{BOLD}⚠️  VALIDATION PASSED WITH WARNINGS - Review before deployment{RESET}\n")
         else:
-            print(f"{Colors.GREEN}{Colors.BOLD}✅ VALIDATION PASSED - Ready for deployment{Colors.RESET}")
-            return True
+            self._emit(f"{GREEN}{BOLD}✅ VALIDATION PASSED - Ready for deployment{RESET}\n")
+
+        self._flush()
+        return not self.errors
+
+    def write_json_summary(self, path):
+        """Write results as JSON for deployment tooling"""
+        summary = {
+            'env_file': self.env_file,
+            'ok': not self.errors,
+            'successes': self.successes,
+            'warnings': self.warnings,
+            'errors': self.errors,
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+            self._log_info(f"JSON summary written to {path}")
+        except OSError as e:
+            self._log_warning(f"Failed to write JSON summary {path}: {e}")
 
     def run_all_checks(self):
         """Run all validation checks"""
-        if not self.load_env():
-            return False
-
-        self.check_required_vars()
-        self.check_no_placeholders()
-        self.check_environment_type()
-        self.check_debug_mode()
-        self.check_database_url()
-        self.check_redis_url()
-        self.check_encryption_key()
-        self.check_jwt_configuration()
-        self.check_password_strength()
-        self.check_phase3_features()
-        self.check_security_settings()
-        self.check_cors_configuration()
-
-        return self.generate_summary()
+        # Flush on every exit so a failing check still shows earlier output
+        try:
+            if not self.load_env():
+                return False
+
+            self.check_required_vars()
+            self.check_no_placeholders()
+            self.check_environment_type()
+            self.check_debug_mode()
+            self.check_database_url()
+            self.check_redis_url()
+            self.check_encryption_key()
+            self.check_jwt_configuration()
+            self.check_password_strength()
+            self.check_phase3_features()
+            self.check_security_settings()
+            self.check_cors_configuration()
+
+            return self.generate_summary()
+        finally:
+            self._flush()
 
 
 def main():
     """Main entry point"""
-    print(f"{Colors.BOLD}PhishX Production Environment Validator{Colors.RESET}")
+    parser = argparse.ArgumentParser(description="Validate .env.production before deployment")
+    parser.add_argument(
+        '--stream', action='store_true',
+        help="Print results as each check runs instead of once at the end",
+    )
+    parser.add_argument(
+        '--json', nargs='?', const='.env.validation.json', default=None, metavar='PATH',
+        help="Also write a JSON summary (default: .env.validation.json)",
+    )
+    args = parser.parse_args()
+
+    print(f"{BOLD}PhishX Production Environment Validator{RESET}")
     print(f"Version 1.0.0 | February 2026\n")
 
     # Check if .env.production exists
@@ -458,7 +664,7 @@ def main():
         print_info("Create it first using: ENV_SETUP_GUIDE.md")
         sys.exit(1)
 
-    validator = EnvValidator()
+    validator = EnvValidator(stream=args.stream, json_file=args.json)
     success = validator.run_all_checks()
 
     sys.exit(0 if success else 1)
@@ -6,12 +6,27 @@ Tests all Phase 3 components to ensure integration is complete.
 Run after deploying Phase 3 to verify everything is working.
 """
 
+import argparse
 import os
+import re
 import sys
+import io
 import subprocess
 import json
+import importlib
+import py_compile
+import shutil
 import time
-from pathlib import Path
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
 
 # Project paths
 BASE_DIR = Path(__file__).resolve().parent
@@ -41,6 +56,35 @@ def print_test(name, passed, details=""):
     print()
 
 
+_import_failures = {}
+
+
+def _cached_import(name):
+    """Import a module, re-raising a recorded failure instead of retrying it"""
+    # import_module returns cached modules itself and, unlike a bare
+    # sys.modules lookup, waits while another test thread is mid-import
+    if name in _import_failures:
+        raise _import_failures[name]
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        _import_failures[name] = e
+        raise
+
+
+def _scan_for_markers(content, markers):
+    """Return the markers that occur in content, using one regex pass"""
+    pattern = re.compile("|".join(re.escape(m) for m in markers))
+    found = set()
+    for match in pattern.finditer(content):
+        found.add(match.group())
+        if len(found) == len(markers):
+            return found  # everything located; skip the rest of the file
+    # Overlapping occurrences can hide a marker from findall; confirm misses directly
+    found.update(m for m in markers if m not in found and m in content)
+    return found
+
+
 def test_imports():
     """Test that all Phase 3 modules can be imported"""
     print_header("Testing Phase 3 Module Imports")
@@ -60,7 +104,7 @@ def test_imports():
     
     for module_name, description in modules:
         try:
-            __import__(module_name)
+            _cached_import(module_name)
             print_test(f"Import {module_name}", True, description)
         except ImportError as e:
             print_test(f"Import {module_name}", False, str(e))
@@ -80,11 +124,12 @@ def test_environment():
     ]
     
     all_passed = True
+    env = os.environ  # bind once; copying it would decode every entry
     
     # Check required variables
     print("Required Variables:")
     for var in required_vars:
-        value = os.getenv(var, "")
+        value = env.get(var, "")
         is_set = bool(value) and value != ""
         print_test(f"{var}", is_set, "configured" if is_set else "missing")
         if not is_set:
@@ -93,7 +138,7 @@ def test_environment():
     # Check Phase 3 variables (optional but show status)
     print("\nPhase 3 Variables (Optional):")
     for var in phase3_vars:
-        value = os.getenv(var, "")
+        value = env.get(var, "")
         is_set = bool(value) and value != ""
         details = "configured" if is_set else "not set (use defaults)"
         print_test(f"{var}", True, details)
@@ -125,9 +170,20 @@ def test_file_structure():
     
     all_passed = True
     
-    for display_name, file_path in files:
-        exists = file_path.exists()
-        print_test(f"File {display_name}", exists)
+    # One directory listing per parent instead of a stat() per file
+    listings = {}
+    for _, file_path in files:
+        parent = file_path.parent
+        if parent not in listings:
+            try:
+                with os.scandir(parent) as entries:
+                    listings[parent] = {entry.name for entry in entries}
+            except OSError:
+                listings[parent] = set()
+    
+    for display_name, file_path in files:
+        exists = file_path.name in listings[file_path.parent]
+        print_test(f"File {display_name}", exists)
         if not exists:
             all_passed = False
     
@@ -150,19 +206,15 @@ def test_app_syntax():
     
     all_passed = True
     
+    # Compile in-process rather than starting an interpreter per file
     for filename in python_files:
         try:
-            result = subprocess.run(
-                [sys.executable, "-m", "py_compile", filename],
-                capture_output=True,
-                timeout=10,
-                cwd=BASE_DIR,
-            )
-            passed = result.returncode == 0
-            print_test(f"Syntax {filename}", passed)
-            if not passed:
-                print(f"    Error: {result.stderr.decode()}")
-                all_passed = False
+            py_compile.compile(str(BASE_DIR / filename), doraise=True)
+            print_test(f"Syntax {filename}", True)
+        except py_compile.PyCompileError as e:
+            print_test(f"Syntax {filename}", False)
+            print(f"    Error: {e.msg}")
+            all_passed = False
         except Exception as e:
             print_test(f"Syntax {filename}", False, str(e))
             all_passed = False
@@ -170,14 +222,39 @@ def test_app_syntax():
     return all_passed
 
 
-def test_docker_setup():
+def _check_compose_file():
+    """Parse docker-compose.yml in-process and check it declares services"""
+    try:
+        with open(ROOT_DIR / "docker-compose.yml", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        print_test("Docker-compose config valid", False, str(e))
+        return False
+    
+    config_valid = isinstance(config, dict) and "services" in config
+    print_test("Docker-compose config valid", config_valid,
+               "" if config_valid else "no services defined")
+    return config_valid
+
+
+def test_docker_setup(deep=False):
     """Test docker-compose configuration"""
     print_header("Testing Docker Setup")
     
+    # A YAML parse covers the common case; --deep runs `docker compose config`
+    if YAML_AVAILABLE and not deep:
+        return _check_compose_file()
+    
+    # Skip the exec attempt entirely when docker is not on PATH
+    docker = shutil.which("docker")
+    if not docker:
+        print_test("Docker-compose available", False, "docker binary not found")
+        return False
+    
     try:
         # Check if docker-compose.yml exists and is valid
-        result = subprocess.run(
-            ["docker", "compose", "config"],
+        result = subprocess.run(
+            [docker, "compose", "config"],
             capture_output=True,
             timeout=10,
             cwd=ROOT_DIR,
@@ -215,7 +292,7 @@ def test_dependencies():
     
     for package, description in packages:
         try:
-            __import__(package)
+            _cached_import(package)
             print_test(f"Package {package}", True, description)
         except ImportError:
             print_test(f"Package {package}", False, description)
@@ -241,11 +318,11 @@ def test_endpoints():
     
     # Read app_new.py and check for endpoints
     try:
-        with open(BASE_DIR / "app_new.py", "r") as f:
-            content = f.read()
+        content = (BASE_DIR / "app_new.py").read_text(encoding="utf-8")
+        present = _scan_for_markers(content, [e for e, _ in endpoints])
         
         for endpoint, description in endpoints:
-            found = endpoint in content
+            found = endpoint in present
             print_test(f"Endpoint {endpoint}", found, description)
             if not found:
                 all_passed = False
@@ -288,7 +365,7 @@ def test_integration_bridges():
     
     for module_name, functions in bridges.items():
         try:
-            module = __import__(module_name)
+            module = _cached_import(module_name)
             for func_name in functions:
                 has_func = hasattr(module, func_name)
                 details = f"{module_name}.{func_name}"
@@ -307,8 +384,7 @@ def test_process_email_integration():
     print_header("Testing process_email Integration")
     
     try:
-        with open(BASE_DIR / "tasks.py", "r") as f:
-            content = f.read()
+        content = (BASE_DIR / "tasks.py").read_text(encoding="utf-8")
         
         checks = [
             ("ANOMALY_DETECTION_AVAILABLE", "Anomaly detection import"),
@@ -317,9 +393,10 @@ def test_process_email_integration():
             ("handle_anomaly_alert(", "Anomaly alert handling"),
         ]
         
+        present = _scan_for_markers(content, [c for c, _ in checks])
         all_passed = True
         for check_str, description in checks:
-            found = check_str in content
+            found = check_str in present
             print_test(description, found)
             if not found:
                 all_passed = False
@@ -336,8 +413,7 @@ def test_database_encryption():
     print_header("Testing Database Encryption Integration")
     
     try:
-        with open(BASE_DIR / "db.py", "r") as f:
-            content = f.read()
+        content = (BASE_DIR / "db.py").read_text(encoding="utf-8")
         
         checks = [
             ("ENCRYPTION_AVAILABLE", "Encryption import"),
@@ -346,9 +422,10 @@ def test_database_encryption():
             ("select_decrypted(", "Decrypted select function"),
         ]
         
+        present = _scan_for_markers(content, [c for c, _ in checks])
         all_passed = True
         for check_str, description in checks:
-            found = check_str in content
+            found = check_str in present
             print_test(description, found)
             if not found:
                 all_passed = False
@@ -360,6 +437,52 @@ def test_database_encryption():
         return False
 
 
+class _ThreadBufferedStdout:
+    """sys.stdout stand-in that routes each worker thread's output to its own buffer"""
+
+    def __init__(self, target):
+        self.target = target
+        self._local = threading.local()
+
+    def write(self, text):
+        buf = getattr(self._local, "buf", None)
+        return (buf if buf is not None else self.target).write(text)
+
+    def flush(self):
+        self.target.flush()
+
+    def __getattr__(self, name):
+        # isatty(), encoding, fileno() and the rest come from the real stream
+        return getattr(self.target, name)
+
+    def capture(self, func):
+        """Run func with this thread's output buffered; return (result, output)"""
+        self._local.buf = io.StringIO()
+        try:
+            result = func()
+            return result, self._local.buf.getvalue()
+        finally:
+            self._local.buf = None
+
+
+def run_tests(tests):
+    """Run independent test phases concurrently, printing output in order"""
+    proxy = _ThreadBufferedStdout(sys.stdout)
+    sys.stdout = proxy
+    try:
+        workers = min(len(tests), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(proxy.capture, test) for test in tests]
+            results = []
+            for future in futures:
+                passed, output = future.result()
+                proxy.target.write(output)
+                results.append(passed)
+    finally:
+        sys.stdout = proxy.target
+    return results
+
+
 def print_summary(results):
     """Print test summary"""
     print_header("Test Summary")
@@ -381,23 +504,31 @@ def print_summary(results):
 
 def main():
     """Run all tests"""
+    parser = argparse.ArgumentParser(description="Phase 3 integration validation")
+    parser.add_argument(
+        "--deep",
+        action="store_true",
+        help="validate docker-compose.yml with `docker compose config` instead of a YAML parse",
+    )
+    args = parser.parse_args()
+    
     print(f"{BLUE}{'#'*60}{RESET}")
     print(f"{BLUE}# Phase 3 Integration Validation{RESET}")
     print(f"{BLUE}# {time.strftime('%Y-%m-%d %H:%M:%S')}{RESET}")
     print(f"{BLUE}{'#'*60}{RESET}")
     
-    results = [
-        test_file_structure(),
-        test_imports(),
-        test_dependencies(),
-        test_environment(),
-        test_app_syntax(),
-        test_endpoints(),
-        test_integration_bridges(),
-        test_process_email_integration(),
-        test_database_encryption(),
-        test_docker_setup(),
-    ]
+    results = run_tests([
+        test_file_structure,
+        test_imports,
+        test_dependencies,
+        test_environment,
+        test_app_syntax,
+        test_endpoints,
+        test_integration_bridges,
+        test_process_email_integration,
+        test_database_encryption,
+        partial(test_docker_setup, deep=args.deep),
+    ])
     
     all_passed = print_summary(results)
     
@@ -7,42 +7,14 @@ Prevents injection attacks and ensures data integrity.
 
 from typing import List, Optional
 from enum import Enum
+from functools import lru_cache, partial
+from itertools import chain
 from pydantic import BaseModel, Field, validator, HttpUrl
-
-# Compatibility: provide a stable `root_validator` decorator that maps to
-# Pydantic v2's `model_validator(mode='after')` when available. If the
-# installed Pydantic exposes the deprecated `root_validator` (v1 compatibility)
-# we'll prefer the v2-style wrapper to avoid v2 runtime errors about
-# `skip_on_failure` and deprecation.
-try:
-    # Prefer v2 API
-    from pydantic import model_validator as _model_validator
-
-    def root_validator(func=None, **kwargs):
-        """Map legacy `@root_validator` usage to `@model_validator(mode='after')`."""
-        if func is None:
-            return _model_validator(mode='after', **kwargs)
-        return _model_validator(mode='after', **kwargs)(func)
-except Exception:
-    # Fallback: try to import the legacy root_validator (pydantic v1 compat)
-    try:
-        from pydantic import root_validator as _legacy_root_validator
-
-        def root_validator(func=None, **kwargs):
-            if func is None:
-                return _legacy_root_validator(**kwargs)
-            return _legacy_root_validator(func, **kwargs)
-    except Exception:
-        # Last-resort no-op decorator to keep runtime working in constrained
-        # environments (e.g., during tests where pydantic may be absent).
-        def root_validator(func=None, **kwargs):
-            if func is None:
-                def _decorator(f):
-                    return f
-                return _decorator
-            return func
-from email_validator import validate_email, EmailNotValidError
+from _pydantic_compat import root_validator
 import re
+import uuid
+import socket
+import ipaddress
 from urllib.parse import urlparse
 
 # ========================================
@@ -68,6 +40,85 @@ INTERNAL_IP_RANGES = {
 
 DISALLOWED_SCHEMES = {"file://", "gopher://", "dict://", "sftp://"}
 
+_DISALLOWED_SCHEMES = tuple(sorted(s.lower() for s in DISALLOWED_SCHEMES))
+_ALLOWED_SCHEMES = ("http://", "https://")
+_FILENAME_RE = re.compile(r"^[\w\-. ]+$")
+# Alphabet and trailing padding accepted by base64.b64decode(validate=True);
+# group 1 is the padding, so its start is the number of data characters
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/]*(=*)")
+
+_INTERNAL_NETS = tuple(ipaddress.ip_network(cidr) for cidr in INTERNAL_IP_RANGES)
+
+# Non-IP hostnames that start like an internal dotted quad (e.g. DNS
+# rebinding names such as 10.0.0.1.nip.io) stay blocked by prefix
+_INTERNAL_HOST_PREFIX_RE = re.compile(
+    r"^(?:127\.|10\.|172\.(?:1[6-9]|2[0-9]|3[01])\.|192\.168\.)"
+)
+
+
+_UUID_RE = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+
+
+def _is_uuid(value):
+    """True if value parses as a UUID; canonical form is matched without uuid.UUID"""
+    if _UUID_RE.fullmatch(value):
+        return True
+    try:
+        uuid.UUID(value)  # braces, urn:uuid: and unhyphenated forms
+        return True
+    except ValueError:
+        return False
+
+
+def _strip_nulls(value):
+    """Remove null bytes; the membership test skips the copy for clean input"""
+    if "\x00" in value:
+        return value.replace("\x00", "")
+    return value
+
+
+_email_validator = None
+
+
+def _get_email_validator():
+    """Import email_validator on first use; it pulls in dnspython"""
+    global _email_validator
+    if _email_validator is None:
+        from email_validator import validate_email, EmailNotValidError
+        _email_validator = (validate_email, EmailNotValidError)
+    return _email_validator
+
+
+def _parse_ip_host(hostname):
+    """Return hostname as an IP address (including short forms like 127.1), or None"""
+    try:
+        return ipaddress.ip_address(hostname)
+    except ValueError:
+        pass
+    try:
+        # inet_aton accepts the legacy forms HTTP clients resolve (127.1, 2130706433)
+        return ipaddress.IPv4Address(socket.inet_aton(hostname))
+    except (OSError, ValueError):
+        return None
+
+
+def _is_internal_host(hostname):
+    """True if hostname is localhost or an internal/non-routable address"""
+    ip = _parse_ip_host(hostname)
+    if ip is not None:
+        return (
+            ip.is_private
+            or ip.is_loopback
+            or ip.is_link_local
+            or ip.is_reserved
+            or ip.is_unspecified
+            or any(ip in net for net in _INTERNAL_NETS)
+        )
+    hostname = hostname.lower()
+    return hostname == "localhost" or _INTERNAL_HOST_PREFIX_RE.match(hostname) is not None
+
 # ========================================
 # Enums
 # ========================================
@@ -110,21 +161,69 @@ class Attachment(BaseModel):
         if ".." in v or "/" in v or "\\" in v:
             raise ValueError("Invalid filename: path traversal detected")
         # Only allow alphanumeric, dots, dashes, underscores
-        if not re.match(r"^[\w\-. ]+$", v):
+        if not _FILENAME_RE.match(v):
             raise ValueError("Filename contains invalid characters")
         return v
     
     @validator("base64")
     def validate_base64(cls, v):
         """Validate base64 encoding"""
-        import base64
-        try:
-            base64.b64decode(v, validate=True)
-        except Exception:
+        # Check alphabet and padding only; decoding would copy the payload
+        match = _BASE64_RE.fullmatch(v)
+        if match is None:
+            raise ValueError("Invalid base64 encoding")
+        # binascii's strict rules: a final quad of 2 or 3 characters takes
+        # exactly 2 or 1 '=', a complete one tolerates any trailing '='
+        data_len = match.start(1)
+        padding = len(v) - data_len
+        partial = data_len % 4
+        if partial:
+            valid = partial > 1 and partial + padding == 4
+        else:
+            valid = data_len > 0 or padding == 0
+        if not valid:
             raise ValueError("Invalid base64 encoding")
         return v
 
 
+@lru_cache(maxsize=4096)
+def _validate_url_str(v):
+    """Validate URL format and prevent SSRF attacks (cached; pure function of v)"""
+    v = v.strip()
+
+    # Check for disallowed schemes
+    v_lower = v.lower()
+    if v_lower.startswith(_DISALLOWED_SCHEMES):
+        scheme = next(s for s in _DISALLOWED_SCHEMES if v_lower.startswith(s))
+        raise ValueError(f"Disallowed URL scheme: {scheme}")
+
+    # Ensure HTTP/HTTPS
+    if not v.startswith(_ALLOWED_SCHEMES):
+        raise ValueError("Invalid URL scheme - must be HTTP or HTTPS")
+
+    try:
+        parsed = urlparse(v)
+        hostname = parsed.hostname
+
+        if not hostname:
+            raise ValueError("URL missing hostname")
+
+        # Prevent SSRF attacks - check for internal IPs
+        if _is_internal_host(hostname):
+            raise ValueError(f"SSRF attack detected: internal hostname {hostname}")
+
+        # Check URL length
+        if len(v) > 2048:
+            raise ValueError("URL too long")
+
+    except Exception as e:
+        if "SSRF attack" in str(e) or "Invalid URL" in str(e):
+            raise
+        raise ValueError(f"Invalid URL format: {str(e)}")
+
+    return v
+
+
 class EmailUrl(BaseModel):
     """Validated URL with security checks"""
     url: str = Field(..., max_length=2048)
@@ -132,51 +231,7 @@ class EmailUrl(BaseModel):
     @validator("url")
     def validate_url(cls, v):
         """Validate URL format and prevent SSRF attacks"""
-        v = v.strip()
-        
-        # Check for disallowed schemes
-        for scheme in DISALLOWED_SCHEMES:
-            if v.lower().startswith(scheme):
-                raise ValueError(f"Disallowed URL scheme: {scheme}")
-        
-        # Ensure HTTP/HTTPS
-        if not (v.startswith("http://") or v.startswith("https://")):
-            raise ValueError("Invalid URL scheme - must be HTTP or HTTPS")
-        
-        try:
-            parsed = urlparse(v)
-            hostname = parsed.hostname
-            
-            if not hostname:
-                raise ValueError("URL missing hostname")
-            
-            # Prevent SSRF attacks - check for internal IPs
-            # In production, use ipaddress library to properly check ranges
-            internal_patterns = [
-                r"^127\.",
-                r"^10\.",
-                r"^172\.1[6-9]\.",
-                r"^172\.2[0-9]\.",
-                r"^172\.3[01]\.",
-                r"^192\.168\.",
-                r"^localhost$",
-                r"^0\.0\.0\.0$",
-            ]
-            
-            for pattern in internal_patterns:
-                if re.match(pattern, hostname):
-                    raise ValueError(f"SSRF attack detected: internal hostname {hostname}")
-            
-            # Check URL length
-            if len(v) > 2048:
-                raise ValueError("URL too long")
-                
-        except Exception as e:
-            if "SSRF attack" in str(e) or "Invalid URL" in str(e):
-                raise
-            raise ValueError(f"Invalid URL format: {str(e)}")
-        
-        return v
+        return _validate_url_str(v)
 
 
 # ========================================
@@ -213,6 +268,7 @@ class EmailIngestRequest(BaseModel):
     def validate_sender(cls, v):
         """Validate sender email format"""
         v = v.strip().lower()
+        validate_email, EmailNotValidError = _get_email_validator()
         try:
             valid = validate_email(v, check_deliverability=False)
             return valid.email
@@ -224,54 +280,50 @@ class EmailIngestRequest(BaseModel):
         """Normalize and deduplicate URLs"""
         if not v:
             return []
-        # Remove duplicates while preserving order
-        seen = set()
-        result = []
-        for url in v:
-            url_lower = url.strip().lower()
-            if url_lower not in seen:
-                seen.add(url_lower)
-                result.append(url.strip())
-        return result
+        # Remove case-insensitive duplicates, keeping the first spelling in order
+        first_seen = {}
+        for url in map(str.strip, v):
+            first_seen.setdefault(url.lower(), url)
+        return list(first_seen.values())
     
     @validator("urls", each_item=True)
     def validate_url_items(cls, v):
         """Validate each URL in the list"""
-        EmailUrl(url=v)  # Use nested validator
+        _validate_url_str(v)  # Same checks as EmailUrl, without building a model
         return v
     
     @validator("body")
     def sanitize_body(cls, v):
         """Basic sanitization of email body"""
         # Remove null bytes that could bypass security filters
-        v = v.replace("\x00", "")
-        return v.strip()
+        return _strip_nulls(v).strip()
     
     @validator("subject")
     def sanitize_subject(cls, v):
         """Sanitize subject line"""
-        v = v.replace("\x00", "")
-        return v.strip()
+        return _strip_nulls(v).strip()
     
     @root_validator
     def validate_total_size(cls, values):
-        """Validate total email size"""
-        subject = values.get("subject", "")
-        sender = values.get("sender", "")
-        body = values.get("body", "")
-        urls = values.get("urls", [])
-        attachments = values.get("attachments", [])
+        """Validate total email size, rejecting as soon as the limit is passed"""
+        # Pydantic v2 after-validators receive the model, v1 root validators a dict
+        get = values.get if isinstance(values, dict) else partial(getattr, values)
+        subject = get("subject", "")
+        sender = get("sender", "")
+        body = get("body", "")
+        urls = get("urls", [])
+        attachments = get("attachments", [])
         
-        total_size = (
-            len(subject.encode()) +
-            len(sender.encode()) +
-            len(body.encode()) +
-            sum(len(u.encode()) for u in urls) +
-            sum(len(a.base64.encode()) for a in attachments)
+        sizes = chain(
+            (len(subject.encode()), len(sender.encode()), len(body.encode())),
+            (len(u.encode()) for u in urls),
+            (len(a.base64) for a in attachments),  # base64 is ASCII
         )
-        
-        if total_size > MAX_EMAIL_SIZE:
-            raise ValueError(f"Email size ({total_size} bytes) exceeds maximum ({MAX_EMAIL_SIZE} bytes)")
+        total_size = 0
+        for size in sizes:
+            total_size += size
+            if total_size > MAX_EMAIL_SIZE:
+                raise ValueError(f"Email size ({total_size} bytes) exceeds maximum ({MAX_EMAIL_SIZE} bytes)")
         
         return values
 
@@ -287,6 +339,7 @@ class SMTPEnforceRequest(BaseModel):
     @validator("mail_from")
     def validate_mail_from(cls, v):
         """Validate SMTP sender"""
+        validate_email, EmailNotValidError = _get_email_validator()
         try:
             valid = validate_email(v, check_deliverability=False)
             return valid.email
@@ -296,12 +349,9 @@ class SMTPEnforceRequest(BaseModel):
     @validator("tenant_id")
     def validate_tenant_id(cls, v):
         """Validate tenant ID format (UUID)"""
-        import uuid
-        try:
-            uuid.UUID(v)
-            return v
-        except ValueError:
+        if not _is_uuid(v):
             raise ValueError("Invalid tenant_id format - must be UUID")
+        return v
 
 
 class GraphEnforceRequest(BaseModel):
@@ -316,12 +366,9 @@ class GraphEnforceRequest(BaseModel):
     @validator("tenant_id")
     def validate_tenant_id(cls, v):
         """Validate tenant ID format"""
-        import uuid
-        try:
-            uuid.UUID(v)
-            return v
-        except ValueError:
+        if not _is_uuid(v):
             raise ValueError("Invalid tenant_id format")
+        return v
 
 
 # ========================================